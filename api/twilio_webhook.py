@@ -5,17 +5,24 @@ Handle incoming calls and recordings from Twilio.
 
 from fastapi import APIRouter, Request, Form, HTTPException, BackgroundTasks
 from fastapi.responses import Response
-from typing import Optional
+from typing import Optional, AsyncIterator
 from pydantic import BaseModel
 from datetime import datetime
+from functools import lru_cache
 import httpx
+import asyncio
+import logging
 import os
+import time
 
 from services.orchestrator.session_manager import ConversationOrchestrator
+from services.orchestrator.call_sessions import CallSessionStore
 from services.bookings.store import BookingTool
 from services.notifications.whatsapp import WhatsAppService
 from services.logging.log_store import CallLogStore, create_log_from_session
 
+logger = logging.getLogger(__name__)
+
 # Create router
 router = APIRouter(prefix="/api/twilio", tags=["Twilio Webhooks"])
 
@@ -25,6 +32,99 @@ booking_tool = BookingTool()
 whatsapp_service = WhatsAppService()
 log_store = CallLogStore()
 
+# CallSid → session mapping (Redis-backed when REDIS_URL is set)
+call_sessions = CallSessionStore()
+
+# Cap concurrent recording pipelines (download + ASR + LLM + WhatsApp)
+recording_semaphore = asyncio.Semaphore(int(os.getenv("MAX_INFLIGHT_RECORDINGS", "20")))
+
+# At most one owner error alert per interval, so a failing dependency
+# doesn't flood the owner's WhatsApp
+ERROR_ALERT_INTERVAL_SECONDS = 60.0
+_last_error_alert = float("-inf")
+_suppressed_error_alerts = 0
+
+
+def _take_error_alert_slot() -> Optional[int]:
+    """
+    Check whether an owner error alert may be sent now.
+    
+    Returns:
+        Number of alerts suppressed since the last one sent, or None if
+        this alert should be suppressed
+    """
+    global _last_error_alert, _suppressed_error_alerts
+    
+    now = time.monotonic()
+    if now - _last_error_alert < ERROR_ALERT_INTERVAL_SECONDS:
+        _suppressed_error_alerts += 1
+        return None
+    
+    suppressed = _suppressed_error_alerts
+    _last_error_alert = now
+    _suppressed_error_alerts = 0
+    return suppressed
+
+
+def _build_stream_url(public_url: str) -> str:
+    """Media Streams WebSocket URL derived from PUBLIC_URL."""
+    # Ensure it's a WebSocket URL
+    if public_url.startswith("http://"):
+        public_url = public_url.replace("http://", "ws://")
+    elif public_url.startswith("https://"):
+        public_url = public_url.replace("https://", "wss://")
+    
+    return f"{public_url}/media-stream"
+
+
+# Pre-encoded TwiML. Only the per-call values are spliced in at request time.
+@lru_cache(maxsize=8)
+def _stream_twiml_head(public_url: str) -> bytes:
+    """Encoded <Stream> TwiML up to the CallSid, built once per PUBLIC_URL value."""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Connect>
+        <Stream url="{_build_stream_url(public_url)}">
+            <Parameter name="callSid" value=\"""".encode()
+
+
+_STREAM_TWIML_MID = b"""" />
+            <Parameter name="callerPhone" value=\""""
+_STREAM_TWIML_TAIL = b"""" />
+        </Stream>
+    </Connect>
+</Response>"""
+
+_RECORD_TWIML_HEAD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Joanna">
+        Hello! I'm Zylin, your AI receptionist. How can I help you today?
+    </Say>
+    <Record 
+        action="/api/twilio/recording/"""
+_RECORD_TWIML_TAIL = b""""
+        maxLength="30"
+        playBeep="true"
+        timeout="5"
+        transcribe="false"
+    />
+    <Say voice="Polly.Joanna">
+        I didn't receive a response. Please call back if you need assistance.
+    </Say>
+    <Hangup/>
+</Response>"""
+
+_PROCESSING_TWIML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Joanna">
+        Thank you. Let me help you with that.
+    </Say>
+    <Pause length="2"/>
+    <Hangup/>
+</Response>"""
+
+_HANGUP_TWIML = b"<Response><Hangup/></Response>"
+
 
 class CallStatus(BaseModel):
     """Call status information from Twilio."""
@@ -53,37 +153,24 @@ async def handle_incoming_call(
     NOTE: This now uses <Stream> for real-time audio instead of <Record>.
     To use the old recording-based approach, see handle_incoming_call_legacy below.
     """
-    print(f"\n📞 Incoming call from {From} (SID: {CallSid})")
+    logger.info("📞 Incoming call from %s (SID: %s)", From, CallSid)
     
     # Store call info for WebSocket handler
-    session_mapping[CallSid] = {
+    await call_sessions.set(CallSid, {
         "caller_phone": From,
         "call_sid": CallSid,
         "session_id": None  # Will be set by WebSocket handler
-    }
+    })
     
-    # Get public URL from environment or request
-    # In production, this should be your domain
+    # TwiML response to open Media Stream for real-time audio. PUBLIC_URL is read
+    # per request (not at import) so lifespan or test overrides take effect;
+    # in production it should be your domain
     public_url = os.getenv("PUBLIC_URL", "wss://your-domain.com")
-    
-    # Ensure it's a WebSocket URL
-    if public_url.startswith("http://"):
-        public_url = public_url.replace("http://", "ws://")
-    elif public_url.startswith("https://"):
-        public_url = public_url.replace("https://", "wss://")
-    
-    stream_url = f"{public_url}/media-stream"
-    
-    # TwiML response to open Media Stream for real-time audio
-    twiml_response = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Connect>
-        <Stream url="{stream_url}">
-            <Parameter name="callSid" value="{CallSid}" />
-            <Parameter name="callerPhone" value="{From}" />
-        </Stream>
-    </Connect>
-</Response>"""
+    twiml_response = (
+        _stream_twiml_head(public_url) + CallSid.encode()
+        + _STREAM_TWIML_MID + From.encode()
+        + _STREAM_TWIML_TAIL
+    )
     
     return Response(content=twiml_response, media_type="application/xml")
 
@@ -101,44 +188,30 @@ async def handle_incoming_call_legacy(
     Use this endpoint if you want the old record-then-process behavior
     instead of real-time streaming.
     """
-    print(f"\n📞 Incoming call (LEGACY) from {From} (SID: {CallSid})")
+    logger.info("📞 Incoming call (LEGACY) from %s (SID: %s)", From, CallSid)
     
     # Create session for this call
     session = orchestrator.create_session(caller_phone=From)
     
-    # Store session ID in a way we can retrieve it later
-    # For MVP, we'll use CallSid as session mapping
-    session_mapping[CallSid] = session.session_id
+    # Store the session state itself, not just its ID: the recording callback
+    # may land on another worker, which rebuilds the session from this.
+    # Legacy calls are a single turn, so there's no history to share yet.
+    await call_sessions.set(CallSid, {
+        "session_id": session.session_id,
+        "caller_phone": session.caller_phone,
+        "start_time": session.start_time.isoformat()
+    })
     
     # TwiML response to record the caller
-    twiml_response = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Joanna">
-        Hello! I'm Zylin, your AI receptionist. How can I help you today?
-    </Say>
-    <Record 
-        action="/api/twilio/recording/{CallSid}"
-        maxLength="30"
-        playBeep="true"
-        timeout="5"
-        transcribe="false"
-    />
-    <Say voice="Polly.Joanna">
-        I didn't receive a response. Please call back if you need assistance.
-    </Say>
-    <Hangup/>
-</Response>"""
+    twiml_response = _RECORD_TWIML_HEAD + CallSid.encode() + _RECORD_TWIML_TAIL
     
     return Response(content=twiml_response, media_type="application/xml")
 
 
-# Session mapping (in production, use Redis or database)
-session_mapping = {}
-
-
 @router.post("/recording/{call_sid}")
 async def handle_recording(
     call_sid: str,
+    request: Request,
     background_tasks: BackgroundTasks,
     RecordingUrl: str = Form(...),
     RecordingSid: str = Form(...),
@@ -150,41 +223,33 @@ async def handle_recording(
     This webhook is called when Twilio finishes recording.
     We process the audio and generate a response.
     """
-    print(f"\n🎤 Recording received for call {call_sid}")
-    print(f"   URL: {RecordingUrl}")
-    print(f"   Duration: {RecordingDuration}s")
+    logger.info("🎤 Recording received for call %s (%ss)", call_sid, RecordingDuration)
+    logger.debug("   URL: %s", RecordingUrl)
     
-    # Get session ID
-    session_id = session_mapping.get(call_sid)
-    if not session_id:
-        print(f"❌ Session not found for call {call_sid}")
-        return Response(content="<Response><Hangup/></Response>", media_type="application/xml")
+    # Get session state
+    call_state = await call_sessions.get(call_sid)
+    if not call_state or not call_state.get("session_id"):
+        logger.warning("❌ Session not found for call %s", call_sid)
+        return Response(content=_HANGUP_TWIML, media_type="application/xml")
     
     # Process recording in background
     background_tasks.add_task(
         process_recording_and_respond,
         recording_url=RecordingUrl,
-        session_id=session_id,
-        call_sid=call_sid
+        call_state=call_state,
+        call_sid=call_sid,
+        http_client=request.app.state.twilio_http
     )
     
     # Immediate TwiML response (tell caller we're processing)
-    twiml_response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Joanna">
-        Thank you. Let me help you with that.
-    </Say>
-    <Pause length="2"/>
-    <Hangup/>
-</Response>"""
-    
-    return Response(content=twiml_response, media_type="application/xml")
+    return Response(content=_PROCESSING_TWIML, media_type="application/xml")
 
 
 async def process_recording_and_respond(
     recording_url: str,
-    session_id: str,
-    call_sid: str
+    call_state: dict,
+    call_sid: str,
+    http_client: httpx.AsyncClient
 ):
     """
     Background task to process recording and send response via WhatsApp.
@@ -193,122 +258,150 @@ async def process_recording_and_respond(
     1. Download recording from Twilio
     2. Transcribe with ASR
     3. Process with LLM brain
-    4. Take action (booking, escalation, etc.)
-    5. Send response via WhatsApp
+    4. Send response via WhatsApp (starts as soon as the reply is ready)
+    5. Take action (booking, escalation, etc.)
     6. Log the call
     """
-    try:
-        print(f"\n🔄 Processing recording for session {session_id}")
-        
-        # Get session
-        session = orchestrator.get_session(session_id)
-        if not session:
-            print(f"❌ Session {session_id} not found")
-            return
-        
-        # Step 1: Download recording
-        print("📥 Downloading recording...")
-        audio_data = await download_twilio_recording(recording_url)
-        
-        # Step 2: Transcribe
-        print("🎤 Transcribing audio...")
-        from services.asr.transcribe import ASRService
-        asr = ASRService()
-        transcription = await asr.transcribe_bytes(
-            audio_data,
-            filename="recording.wav"
-        )
-        user_text = transcription.text
-        print(f"📝 User said: {user_text}")
-        
-        # Step 3: Process with brain
-        print("🧠 Processing with Zylin brain...")
-        result = await orchestrator.process_text_turn(user_text, session_id)
-        
-        print(f"📊 Intent: {result.intent}")
-        print(f"🤖 Response: {result.bot_text}")
-        
-        # Step 4: Take actions based on intent
-        booking_id = None
-        
-        if result.intent == "booking" and result.booking_complete:
-            print("📅 Creating booking...")
-            booking = booking_tool.create_booking_from_conversation(
-                result.extracted_data,
-                session_id
-            )
-            booking_id = booking.booking_id
+    session_id = call_state["session_id"]
+    async with recording_semaphore:
+        try:
+            logger.debug("🔄 Processing recording for session %s", session_id)
             
-            # Send WhatsApp confirmation
-            whatsapp_service.send_booking_confirmation(
-                customer_name=booking.customer_name,
-                customer_phone=booking.customer_phone,
-                appointment_date=booking.appointment_date,
-                appointment_time=booking.appointment_time,
-                business_name=os.getenv("BUSINESS_NAME", "Our Business")
-            )
+            # Get session, rebuilding it if the call started on another worker
+            session = orchestrator.get_session(session_id)
+            if not session:
+                logger.debug("♻️  Restoring session %s from the call store", session_id)
+                session = orchestrator.create_session(
+                    caller_phone=call_state.get("caller_phone"),
+                    session_id=session_id,
+                    start_time=datetime.fromisoformat(call_state["start_time"])
+                )
             
-        elif result.intent == "urgent" and result.needs_escalation:
-            print("🚨 Escalating to owner...")
-            whatsapp_service.send_urgent_alert(
-                owner_phone=os.getenv("OWNER_PHONE", "+919876543210"),
-                caller_phone=session.caller_phone or "Unknown",
-                issue_summary=result.extracted_data.get("issue_summary", "Urgent issue"),
-                business_name=os.getenv("BUSINESS_NAME", "Our Business")
+            # Step 1+2: Stream recording from Twilio into ASR
+            logger.debug("🎤 Downloading and transcribing recording...")
+            transcription = await orchestrator.asr.transcribe_chunks(
+                download_twilio_recording(recording_url, http_client),
+                filename="recording.wav"
             )
-        
-        # Step 5: Send response via WhatsApp (for all intents)
-        print("📱 Sending WhatsApp response...")
-        if session.caller_phone:
-            whatsapp_service.send_message(
-                to_phone=session.caller_phone,
-                message=result.bot_text
+            user_text = transcription.text
+            logger.info("📝 User said: %s", user_text)
+            
+            # Step 3: Process with brain
+            logger.debug("🧠 Processing with Zylin brain...")
+            result = await orchestrator.process_text_turn(user_text, session_id)
+            
+            logger.info("📊 Intent: %s", result.intent)
+            logger.info("🤖 Response: %s", result.bot_text)
+            
+            # Notifications and the log write are independent, so they are
+            # collected here and run concurrently below.
+            pending = {}
+            
+            # Step 4: Send response via WhatsApp (for all intents)
+            # Started immediately: it only needs the reply text, so the caller
+            # hears back while the booking is written.
+            if session.caller_phone:
+                pending["WhatsApp response"] = asyncio.create_task(
+                    whatsapp_service.send_message_async(
+                        to_phone=session.caller_phone,
+                        message=result.bot_text
+                    )
+                )
+            
+            # Step 5: Take actions based on intent
+            booking_id = None
+            business_name = os.getenv("BUSINESS_NAME", "Our Business")
+            
+            if result.intent == "booking" and result.booking_complete:
+                logger.info("📅 Creating booking...")
+                booking = await asyncio.to_thread(
+                    booking_tool.create_booking_from_conversation,
+                    result.extracted_data,
+                    session_id
+                )
+                booking_id = booking.booking_id
+                
+                # Send WhatsApp confirmation
+                pending["booking confirmation"] = asyncio.to_thread(
+                    whatsapp_service.send_booking_confirmation,
+                    customer_name=booking.customer_name,
+                    customer_phone=booking.customer_phone,
+                    appointment_date=booking.appointment_date,
+                    appointment_time=booking.appointment_time,
+                    business_name=business_name
+                )
+                
+            elif result.intent == "urgent" and result.needs_escalation:
+                logger.info("🚨 Escalating to owner...")
+                pending["urgent alert"] = asyncio.to_thread(
+                    whatsapp_service.send_urgent_alert,
+                    owner_phone=os.getenv("OWNER_PHONE", "+919876543210"),
+                    caller_phone=session.caller_phone or "Unknown",
+                    issue_summary=result.extracted_data.get("issue_summary", "Urgent issue"),
+                    business_name=business_name
+                )
+            
+            # Step 6: Log the call
+            session_data = orchestrator.get_session_summary(session_id)
+            log = create_log_from_session(
+                session_data,
+                booking_id=booking_id,
+                summary=f"{result.intent} - {user_text[:50]}"
             )
+            pending["call log"] = asyncio.to_thread(log_store.create_log, log)
+            
+            logger.debug("📱 Sending notifications and logging call (%d tasks)...", len(pending))
+            outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+            for name, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error("❌ Failed %s for %s: %s", name, call_sid, outcome)
+            
+            logger.info("✅ Call processing complete for %s", call_sid)
+            
+        except Exception as e:
+            logger.exception("❌ Error processing recording for %s: %s", call_sid, e)
+            
+            # Send error notification to owner (rate limited)
+            suppressed = _take_error_alert_slot()
+            if suppressed is not None:
+                message = f"⚠️ Error processing call {call_sid}: {str(e)}"
+                if suppressed:
+                    message += f"\n({suppressed} more errors since the last alert)"
+                try:
+                    await whatsapp_service.send_message_async(
+                        to_phone=os.getenv("OWNER_PHONE", "+919876543210"),
+                        message=message
+                    )
+                except Exception:
+                    logger.warning("⚠️  Failed to send error alert for %s", call_sid)
         
-        # Step 6: Log the call
-        print("📝 Logging call...")
-        session_data = orchestrator.get_session_summary(session_id)
-        log = create_log_from_session(
-            session_data,
-            booking_id=booking_id,
-            summary=f"{result.intent} - {user_text[:50]}"
-        )
-        log_store.create_log(log)
-        
-        print(f"✅ Call processing complete for {call_sid}")
-        
-    except Exception as e:
-        print(f"❌ Error processing recording: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        # Send error notification to owner
-        try:
-            whatsapp_service.send_message(
-                to_phone=os.getenv("OWNER_PHONE", "+919876543210"),
-                message=f"⚠️ Error processing call {call_sid}: {str(e)}"
-            )
-        except:
-            pass
+        finally:
+            await call_sessions.delete(call_sid)
+            orchestrator.end_session(session_id)
 
 
-async def download_twilio_recording(recording_url: str) -> bytes:
-    """Download recording from Twilio."""
-    # Twilio recordings need authentication
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+async def download_twilio_recording(
+    recording_url: str,
+    client: httpx.AsyncClient
+) -> AsyncIterator[bytes]:
+    """
+    Stream a recording from Twilio in chunks.
     
+    Args:
+        recording_url: Recording URL from the Twilio callback
+        client: Shared HTTP client (authenticated with Twilio credentials)
+        
+    Yields:
+        WAV file bytes, 64 KB at a time
+    """
     # Add .wav to get WAV format
     if not recording_url.endswith(".wav"):
         recording_url += ".wav"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            recording_url,
-            auth=(account_sid, auth_token)
-        )
+    async with client.stream("GET", recording_url) as response:
         response.raise_for_status()
-        return response.content
+        async for chunk in response.aiter_bytes(65536):
+            yield chunk
 
 
 @router.post("/status")
@@ -323,7 +416,7 @@ async def handle_call_status(
     
     Useful for tracking call completion, duration, etc.
     """
-    print(f"📊 Call status update: {CallSid} - {CallStatus}")
+    logger.info("📊 Call status update: %s - %s", CallSid, CallStatus)
     
     # Log status changes
     # In production, update call logs with final status
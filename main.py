@@ -6,19 +6,28 @@ Includes WebSocket support for real-time streaming calls.
 
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from typing_extensions import Annotated, TypedDict
 import os
-import json
 import asyncio
-import uuid
+import base64
+import logging
+import orjson
+import httpx
 from contextlib import asynccontextmanager
 
-from services.llm.brain import ZylinBrain, ConversationResponse
+from services.llm.brain import ZylinBrain, ConversationResponse, get_default_brain
 from services.orchestrator.streaming_pipeline import StreamingPipeline
 from services.utils.audio_codec import AudioCodec
-from api.twilio_webhook import router as twilio_router
+from services.utils.audio_channel import AudioOutChannel
+from services.utils.log_setup import setup_queue_logging, stop_queue_logging
+from services.asr.transcribe import get_default_asr, close_default_asr
+from services.utils.ids import new_session_id
+from api.twilio_webhook import router as twilio_router, call_sessions, log_store
+
+logger = logging.getLogger(__name__)
 
 # App metadata
 APP_TITLE = "Zylin AI Receptionist"
@@ -30,10 +39,14 @@ It handles phone calls, answers FAQs, books appointments, and escalates urgent m
 
 
 # Request/Response Models
-class ConversationMessage(BaseModel):
-    """Single message in a conversation."""
-    role: str = Field(..., description="Role: 'user' or 'assistant'")
-    content: str = Field(..., description="Message content")
+class ConversationMessage(TypedDict):
+    """
+    Single message in a conversation.
+    
+    Validated as a plain dict so history can be handed to the brain as-is.
+    """
+    role: Annotated[str, Field(description="Role: 'user' or 'assistant'")]
+    content: Annotated[str, Field(description="Message content")]
 
 
 class ConversationRequest(BaseModel):
@@ -61,22 +74,63 @@ class HealthResponse(BaseModel):
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     # Startup
-    print(f"🚀 Starting {APP_TITLE} v{APP_VERSION}")
-    print(f"📝 Environment: {os.getenv('APP_ENV', 'development')}")
+    app.state.log_listener = setup_queue_logging(os.getenv("LOG_LEVEL", "INFO"))
+    logger.info("🚀 Starting %s v%s", APP_TITLE, APP_VERSION)
+    logger.info("📝 Environment: %s", os.getenv("APP_ENV", "development"))
+    if not ALLOWED_ORIGINS:
+        logger.warning("⚠️  ALLOWED_ORIGINS is empty: browser requests from every origin will be rejected")
     
-    # Initialize global brain instance
-    app.state.brain = ZylinBrain()
-    print("🧠 LLM Brain initialized")
+    # Shared brain instance (also used by the webhook orchestrator)
+    app.state.brain = get_default_brain()
+    logger.info("🧠 LLM Brain initialized")
+    
+    # Business context is fixed for the life of the process; serialize it once
+    app.state.business_json = orjson.dumps(app.state.brain.business_context.model_dump())
     
     # Initialize streaming pipeline
     use_mock = os.getenv("USE_MOCK_STREAMING", "false").lower() == "true"
-    app.state.streaming_pipeline = StreamingPipeline(use_mock_services=use_mock)
-    print(f"🎙️  Streaming pipeline initialized (mock: {use_mock})")
+    app.state.streaming_pipeline = StreamingPipeline(
+        use_mock_services=use_mock,
+        brain=app.state.brain
+    )
+    logger.info("🎙️  Streaming pipeline initialized (mock: %s)", use_mock)
+    
+    # Open the Whisper connection in the background so the first call skips the handshake
+    app.state.asr_warmup = None
+    if not use_mock and os.getenv("OPENAI_API_KEY"):
+        app.state.asr_warmup = asyncio.create_task(get_default_asr().warmup())
+    
+    # Shared HTTP client for Twilio API calls (keeps TLS connections warm)
+    # Basic auth header is encoded once instead of by an auth flow per request
+    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+    twilio_headers = {}
+    if account_sid and auth_token:
+        credentials = base64.b64encode(f"{account_sid}:{auth_token}".encode()).decode()
+        twilio_headers["Authorization"] = f"Basic {credentials}"
+    elif os.getenv("APP_ENV") != "test":
+        # Fail now rather than with 401s on recording downloads mid-call
+        raise RuntimeError(
+            "TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN must be set to download call recordings"
+        )
+    app.state.twilio_http = httpx.AsyncClient(
+        http2=True,
+        headers=twilio_headers,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=30.0
+    )
     
     yield
     
     # Shutdown
-    print("👋 Shutting down Zylin")
+    if app.state.asr_warmup is not None:
+        app.state.asr_warmup.cancel()
+    await app.state.twilio_http.aclose()
+    await close_default_asr()
+    await call_sessions.close()
+    log_store.close()
+    logger.info("👋 Shutting down Zylin")
+    stop_queue_logging(app.state.log_listener)
 
 
 # Create FastAPI app
@@ -87,13 +141,24 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware (adjust origins for production)
+# CORS middleware (comma-separated ALLOWED_ORIGINS; Twilio webhooks don't need CORS).
+# Outside production the local dashboard is allowed by default.
+DEV_ALLOWED_ORIGINS = "http://localhost:3000"
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "ALLOWED_ORIGINS",
+        "" if os.getenv("APP_ENV") == "production" else DEV_ALLOWED_ORIGINS
+    ).split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # TODO: Restrict in production
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # Include Twilio webhook router
@@ -104,7 +169,7 @@ app.include_router(twilio_router)
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle uncaught exceptions."""
-    print(f"❌ Unhandled exception: {exc}")
+    logger.error("❌ Unhandled exception: %s", exc, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -151,24 +216,16 @@ async def process_conversation(request: ConversationRequest):
     try:
         brain: ZylinBrain = app.state.brain
         
-        # Convert history to dict format
-        history = None
-        if request.conversation_history:
-            history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in request.conversation_history
-            ]
-        
-        # Process message
+        # Process message (history is already a list of role/content dicts)
         response = await brain.process_message(
             user_message=request.message,
-            conversation_history=history
+            conversation_history=request.conversation_history or None
         )
         
         return response
         
     except Exception as e:
-        print(f"❌ Error processing conversation: {e}")
+        logger.error("❌ Error processing conversation: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to process conversation"
@@ -187,17 +244,12 @@ async def get_conversation_summary(
     try:
         brain: ZylinBrain = app.state.brain
         
-        history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation_history
-        ]
-        
-        summary = await brain.get_conversation_summary(history)
+        summary = await brain.get_conversation_summary(conversation_history)
         
         return {"summary": summary}
         
     except Exception as e:
-        print(f"❌ Error generating summary: {e}")
+        logger.error("❌ Error generating summary: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to generate conversation summary"
@@ -207,8 +259,21 @@ async def get_conversation_summary(
 @app.get("/business")
 async def get_business_info():
     """Get business context information."""
-    brain: ZylinBrain = app.state.brain
-    return brain.business_context.model_dump()
+    return Response(content=app.state.business_json, media_type="application/json")
+
+
+@app.get("/calls/{session_id}/transcript")
+async def get_call_transcript(session_id: str):
+    """
+    Get the logged conversation of one call.
+    
+    Call listings leave transcripts out; this reads and decodes just one.
+    """
+    transcript = await asyncio.to_thread(log_store.get_transcript, session_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="Call not found")
+    
+    return {"session_id": session_id, "conversation": transcript}
 
 
 @app.websocket("/media-stream")
@@ -230,7 +295,7 @@ async def websocket_media_stream(websocket: WebSocket):
     }
     """
     await websocket.accept()
-    print("\n🔌 WebSocket connection established")
+    logger.info("🔌 WebSocket connection established")
     
     # Get streaming pipeline
     pipeline: StreamingPipeline = app.state.streaming_pipeline
@@ -239,31 +304,40 @@ async def websocket_media_stream(websocket: WebSocket):
     session_id = None
     stream_sid = None
     caller_phone = None
-    audio_queue = asyncio.Queue()  # Queue for outgoing audio
+    audio_queue = AudioOutChannel()  # Outgoing audio, drained in batches
     
     # Audio input buffer
     audio_input_queue = asyncio.Queue()
     
+    # Incoming μ-law frames (20ms each) are batched before decoding and
+    # handing them to the ASR pipeline
+    media_batch_frames = max(
+        1,
+        int(os.getenv("MEDIA_BATCH_MS", "100")) // AudioCodec.CHUNK_SIZE_MS
+    )
+    media_payloads: List[str] = []
+    
     try:
         # Task for sending audio back to Twilio
         async def send_audio_to_twilio():
             """Background task to send audio chunks to Twilio."""
             while True:
                 try:
-                    # Get audio message from queue
-                    message = await audio_queue.get()
+                    # Take everything queued since the last wakeup
+                    batch = await audio_queue.get_batch()
                     
-                    if message is None:  # Shutdown signal
+                    if not batch:  # Channel closed and drained
                         break
                     
-                    # Add stream SID
-                    message["streamSid"] = stream_sid
-                    
-                    # Send to Twilio
-                    await websocket.send_json(message)
+                    for message in batch:
+                        # Add stream SID
+                        message["streamSid"] = stream_sid
+                        
+                        # Send to Twilio (Media Streams only accepts text frames)
+                        await websocket.send_text(orjson.dumps(message).decode())
                     
                 except Exception as e:
-                    print(f"❌ Error sending audio: {e}")
+                    logger.error("❌ Error sending audio: %s", e)
                     break
         
         # Audio stream generator for ASR
@@ -281,9 +355,14 @@ async def websocket_media_stream(websocket: WebSocket):
         
         # Main message loop
         while True:
-            # Receive message from Twilio
-            message_text = await websocket.receive_text()
-            message = json.loads(message_text)
+            # Receive message from Twilio (raw ASGI frame, parsed without
+            # an extra decode step)
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            
+            data = frame.get("text")
+            message = orjson.loads(data if data is not None else frame["bytes"])
             
             event = message.get("event")
             
@@ -294,12 +373,13 @@ async def websocket_media_stream(websocket: WebSocket):
                 custom_params = message["start"].get("customParameters", {})
                 caller_phone = custom_params.get("callerPhone")
                 
-                print(f"📞 Stream started: {stream_sid}")
-                print(f"   Call SID: {call_sid}")
-                print(f"   Caller: {caller_phone}")
+                logger.info(
+                    "📞 Stream started: %s (call: %s, caller: %s)",
+                    stream_sid, call_sid, caller_phone
+                )
                 
                 # Create session
-                session_id = str(uuid.uuid4())
+                session_id = new_session_id()
                 pipeline.create_session(
                     session_id=session_id,
                     caller_phone=caller_phone,
@@ -326,18 +406,22 @@ async def websocket_media_stream(websocket: WebSocket):
                 if session_id is None:
                     continue  # Not ready yet
                 
-                # Decode μ-law audio
-                payload = message["media"]["payload"]
-                pcm_audio = AudioCodec.decode_mulaw_base64(payload)
+                # Accumulate base64 μ-law frames
+                media_payloads.append(message["media"]["payload"])
                 
-                # Add to input queue for ASR
-                await audio_input_queue.put(pcm_audio)
+                # Decode and hand a full batch to ASR
+                if len(media_payloads) >= media_batch_frames:
+                    audio_input_queue.put_nowait(AudioCodec.decode_mulaw_base64_batch(media_payloads))
+                    media_payloads.clear()
             
             elif event == "stop":
                 # Stream stopped
-                print(f"📞 Stream stopped: {stream_sid}")
+                logger.info("📞 Stream stopped: %s", stream_sid)
                 
-                # Signal end of audio input
+                # Flush any partial batch, then signal end of audio input
+                if media_payloads:
+                    audio_input_queue.put_nowait(AudioCodec.decode_mulaw_base64_batch(media_payloads))
+                    media_payloads.clear()
                 await audio_input_queue.put(None)
                 
                 # Wait for pipeline to finish
@@ -345,29 +429,27 @@ async def websocket_media_stream(websocket: WebSocket):
                     try:
                         await asyncio.wait_for(pipeline_task, timeout=5.0)
                     except asyncio.TimeoutError:
-                        print("⚠️  Pipeline task timeout")
+                        logger.warning("⚠️  Pipeline task timeout")
                         pipeline_task.cancel()
                 
                 # Signal sender to stop
-                await audio_queue.put(None)
+                audio_queue.close()
                 
                 # Wait for sender to finish
                 if sender_task:
                     try:
                         await asyncio.wait_for(sender_task, timeout=2.0)
                     except asyncio.TimeoutError:
-                        print("⚠️  Sender task timeout")
+                        logger.warning("⚠️  Sender task timeout")
                         sender_task.cancel()
                 
                 break
     
     except WebSocketDisconnect:
-        print("🔌 WebSocket disconnected")
+        logger.info("🔌 WebSocket disconnected")
     
     except Exception as e:
-        print(f"❌ WebSocket error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ WebSocket error: %s", e)
     
     finally:
         # Cleanup
@@ -383,17 +465,38 @@ async def websocket_media_stream(websocket: WebSocket):
         if pipeline_task and not pipeline_task.done():
             pipeline_task.cancel()
         
-        print("🔌 WebSocket connection closed")
+        logger.info("🔌 WebSocket connection closed")
 
 
 if __name__ == "__main__":
     import uvicorn
     
-    # Run server
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    if os.getenv("APP_ENV") == "production":
+        # Multi-worker server on uvloop + httptools. Twilio callbacks for one
+        # call can reach any worker, so more than one worker needs the shared
+        # (Redis) call session store.
+        workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+        if workers > 1 and not os.getenv("REDIS_URL"):
+            raise SystemExit(
+                f"WEB_CONCURRENCY={workers} requires REDIS_URL so call sessions "
+                "are shared across workers"
+            )
+        
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            log_level="warning"
+        )
+    else:
+        # Single-worker dev server with auto-reload
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
@@ -18,7 +18,7 @@ def generate_daily_report(date_str: str = None):
         date_str = date.today().isoformat()
     
     store = CallLogStore()
-    stats = store.get_daily_stats(date_str)
+    stats, logs = store.get_daily_report(date_str, recent_n=5)
     
     print("\n" + "="*60)
     print(f"  ZYLIN DAILY REPORT - {stats['date']}")
@@ -38,12 +38,10 @@ def generate_daily_report(date_str: str = None):
         seconds = stats['avg_duration_seconds'] % 60
         print(f"⏱️  Average Call Duration: {int(minutes)}m {int(seconds)}s")
     
-    # Get recent calls
-    logs = store.list_logs(start_date=date_str, end_date=date_str, limit=10)
-    
+    # Recent calls
     if logs:
         print(f"\n📋 Recent Calls:")
-        for log in logs[:5]:
+        for log in logs:
             time = log.start_time.split("T")[1][:5] if "T" in log.start_time else "N/A"
             phone = log.caller_phone or "Unknown"
             intent = log.intent or "other"
@@ -10,20 +10,37 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from services.asr.transcribe import ASRService, transcribe
+from services.asr.transcribe import ASRService, transcribe, get_default_asr
 import os
 
 
-async def test_single_file(file_path: str, language: str = None):
-    """Test transcription of a single audio file."""
+async def test_single_file(
+    file_path: str,
+    language: str = None,
+    asr: ASRService = None,
+    quiet: bool = False
+):
+    """
+    Test transcription of a single audio file.
+    
+    With quiet=True nothing is printed and errors are raised, so batch runs
+    can report everything in one summary afterwards.
+    """
+    asr = asr or get_default_asr()
+    
+    if quiet:
+        return await asr.transcribe_file(
+            file_path, language=language, skip_if_silent=True, verbose=True
+        )
+    
     print(f"\n{'='*60}")
     print(f"📁 File: {Path(file_path).name}")
     print(f"{'='*60}")
     
-    asr = ASRService()
-    
     try:
-        result = await asr.transcribe_file(file_path, language=language)
+        result = await asr.transcribe_file(
+            file_path, language=language, skip_if_silent=True, verbose=True
+        )
         
         print(f"\n✅ Transcription successful!")
         print(f"\n📝 Text:\n{result.text}")
@@ -47,8 +64,8 @@ async def test_single_file(file_path: str, language: str = None):
         return None
 
 
-async def test_all_files_in_directory(directory: str = "tests/audio"):
-    """Test all audio files in a directory."""
+async def test_all_files_in_directory(directory: str = "tests/audio", concurrency: int = 8):
+    """Test all audio files in a directory (up to `concurrency` requests in flight)."""
     audio_dir = Path(directory)
     
     if not audio_dir.exists():
@@ -60,10 +77,14 @@ async def test_all_files_in_directory(directory: str = "tests/audio"):
     
     # Supported audio formats
     audio_extensions = {".wav", ".mp3", ".m4a", ".webm", ".ogg", ".flac"}
-    audio_files = [
-        f for f in audio_dir.iterdir()
-        if f.is_file() and f.suffix.lower() in audio_extensions
-    ]
+    
+    # scandir entries carry the file type, so regular files need no extra stat()
+    with os.scandir(audio_dir) as entries:
+        audio_files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file()
+            and os.path.splitext(entry.name)[1].lower() in audio_extensions
+        ]
     
     if not audio_files:
         print(f"⚠️  No audio files found in {directory}")
@@ -73,19 +94,31 @@ async def test_all_files_in_directory(directory: str = "tests/audio"):
     
     print(f"\n🎯 Testing {len(audio_files)} audio file(s)\n")
     
+    # One client (and connection pool) shared by all requests
+    asr = get_default_asr()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run(audio_file: Path):
+        async with semaphore:
+            return await test_single_file(str(audio_file), asr=asr, quiet=True)
+    
+    outcomes = await asyncio.gather(
+        *(run(audio_file) for audio_file in audio_files),
+        return_exceptions=True
+    )
+    
     results = []
-    for audio_file in audio_files:
-        result = await test_single_file(str(audio_file))
-        if result:
+    failures = []
+    for audio_file, result in zip(audio_files, outcomes):
+        if isinstance(result, BaseException):
+            failures.append((audio_file.name, result))
+        elif result:
             results.append({
                 "file": audio_file.name,
                 "text": result.text,
                 "language": result.language,
                 "duration": result.duration
             })
-        
-        # Small delay between files
-        await asyncio.sleep(0.5)
     
     # Summary
     print(f"\n{'='*60}")
@@ -101,6 +134,13 @@ async def test_all_files_in_directory(directory: str = "tests/audio"):
             print(f"   Text: {r['text'][:80]}..." if len(r['text']) > 80 else f"   Text: {r['text']}")
             if r['language']:
                 print(f"   Language: {r['language']}")
+            if r['duration']:
+                print(f"   Duration: {r['duration']:.2f}s")
+    
+    if failures:
+        print("\nFailed:")
+        for name, error in failures:
+            print(f"   ❌ {name}: {error}")
     
     print(f"\n{'='*60}\n")
 
@@ -118,7 +158,7 @@ async def test_with_prompt():
     
     if audio_files:
         file_path = str(audio_files[0])
-        asr = ASRService()
+        asr = get_default_asr()
         
         print("Without prompt:")
         result1 = await asr.transcribe_file(file_path)
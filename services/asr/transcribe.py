@@ -4,13 +4,29 @@ Converts audio (speech) to text using OpenAI Whisper API or local Whisper model.
 Includes real-time streaming support via Deepgram.
 """
 
-from typing import Optional, Literal, AsyncGenerator
+from typing import Optional, Literal, AsyncGenerator, AsyncIterator, Tuple, List
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from io import BytesIO
+import audioop
+import hashlib
+import logging
+import math
 import os
-from pydantic import BaseModel
+import shutil
+import tempfile
+import wave
+import orjson
 from openai import AsyncOpenAI
 import httpx
 import asyncio
+import aiofiles
+import threading
+
+from services.utils.rate_limit import AsyncRateLimiter
+
+logger = logging.getLogger(__name__)
 
 # Streaming ASR support
 try:
@@ -20,15 +36,394 @@ except ImportError:
     DEEPGRAM_AVAILABLE = False
     print("⚠️  Deepgram SDK not available. Install with: pip install deepgram-sdk")
 
+# Local Whisper support (optional fast path for short clips)
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# BLAKE3 hashing for cache keys (SIMD, much faster than SHA-256 on large files)
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Streamed uploads stay in memory up to this size, then spill to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
-class TranscriptionResult(BaseModel):
-    """Result of speech-to-text transcription."""
+# Marks the end of a live transcript stream
+_STREAM_DONE = object()
+
+# Streaming sends are coalesced to ~100ms of 8kHz 16-bit mono PCM per frame
+STREAM_SEND_BYTES = 1600
+
+# Connection pool for the Whisper API client
+ASR_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=100)
+
+# ffmpeg preprocessing (mono 64 kbps MP3, optional tempo change) before upload
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+FFPROBE_AVAILABLE = shutil.which("ffprobe") is not None
+# How much of ffmpeg's stderr to include when preprocessing fails
+FFMPEG_STDERR_TAIL_BYTES = 500
+# Preprocessed MP3s kept in memory, bounded by total size (not entry count,
+# since one long recording can be several MB)
+PREPROCESS_CACHE_MAX_BYTES = int(os.getenv("PREPROCESS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+_preprocess_cache: "OrderedDict[Tuple[str, int, int, float], bytes]" = OrderedDict()
+_preprocess_cache_bytes = 0
+
+
+def _atempo_filter(speedup: float) -> str:
+    """Build an ffmpeg atempo chain (each atempo stage is limited to 0.5-2.0)."""
+    stages = []
+    while speedup > 2.0:
+        stages.append("atempo=2.0")
+        speedup /= 2.0
+    while speedup < 0.5:
+        stages.append("atempo=0.5")
+        speedup /= 0.5
+    stages.append(f"atempo={speedup:g}")
+    return ",".join(stages)
+
+
+async def preprocess_audio(file_path: Path, speedup: float = 1.0) -> Optional[bytes]:
+    """
+    Downmix and compress an audio file with ffmpeg for cheaper, faster upload.
+    
+    Results are cached by (path, mtime, size, speedup) in an LRU holding at
+    most PREPROCESS_CACHE_MAX_BYTES of audio.
+    
+    Args:
+        file_path: Source audio file
+        speedup: Playback tempo factor (e.g. 2.0 halves the billed duration)
+        
+    Returns:
+        MP3 bytes, or None if ffmpeg is unavailable or fails
+    """
+    if not FFMPEG_AVAILABLE:
+        return None
+    
+    stat = file_path.stat()
+    key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size, speedup)
+    cached = _preprocess_cache.get(key)
+    if cached is not None:
+        _preprocess_cache.move_to_end(key)
+        return cached
+    
+    args = ["ffmpeg", "-v", "error", "-i", str(file_path), "-ac", "1"]
+    if speedup != 1.0:
+        args += ["-filter:a", _atempo_filter(speedup)]
+    args += ["-b:a", "64k", "-f", "mp3", "pipe:1"]
+    
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0 or not out:
+        logger.warning(
+            "⚠️  ffmpeg preprocessing failed (exit %s), uploading original: %s",
+            proc.returncode,
+            err[-FFMPEG_STDERR_TAIL_BYTES:].decode(errors="replace").strip()
+        )
+        return None
+    
+    _cache_preprocessed(key, out)
+    return out
+
+
+def _cache_preprocessed(key: Tuple[str, int, int, float], audio: bytes) -> None:
+    """Add preprocessed audio to the LRU, evicting oldest entries to stay under budget."""
+    global _preprocess_cache_bytes
+    
+    if len(audio) > PREPROCESS_CACHE_MAX_BYTES:
+        return
+    
+    previous = _preprocess_cache.pop(key, None)
+    if previous is not None:
+        _preprocess_cache_bytes -= len(previous)
+    
+    _preprocess_cache[key] = audio
+    _preprocess_cache_bytes += len(audio)
+    while _preprocess_cache_bytes > PREPROCESS_CACHE_MAX_BYTES:
+        _, evicted = _preprocess_cache.popitem(last=False)
+        _preprocess_cache_bytes -= len(evicted)
+
+
+@dataclass(slots=True)
+class TranscriptionResult:
+    """Result of speech-to-text transcription (plain dataclass: built on every API call)."""
     text: str
     language: Optional[str] = None
     duration: Optional[float] = None
     confidence: Optional[float] = None
 
 
+# Transcription cache: content hash + request options → result JSON on disk
+ASR_CACHE_DIR = Path(os.getenv("ASR_CACHE_DIR") or Path.home() / ".cache" / "zylin-asr")
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+HASH_ALGORITHM = "blake3" if BLAKE3_AVAILABLE else "sha256"
+
+
+def _new_hasher():
+    """Content hasher: BLAKE3 when installed, SHA-256 otherwise."""
+    return blake3() if BLAKE3_AVAILABLE else hashlib.sha256()
+
+
+def hash_bytes(data: bytes) -> str:
+    """Content digest of in-memory audio, prefixed with the algorithm name."""
+    digest = _new_hasher()
+    digest.update(data)
+    return f"{HASH_ALGORITHM}:{digest.hexdigest()}"
+
+
+def hash_file(file_path: Path) -> str:
+    """Content digest of a file read in 1 MB blocks, prefixed with the algorithm name."""
+    digest = _new_hasher()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return f"{HASH_ALGORITHM}:{digest.hexdigest()}"
+
+
+# Long recordings are split into overlapping segments transcribed in parallel
+LONG_AUDIO_MAX_BYTES = 20 * 1024 * 1024  # Whisper API rejects uploads over 25 MB
+LONG_AUDIO_MAX_SECONDS = 600
+LONG_AUDIO_PROBE_BYTES = 1024 * 1024  # Smaller files can't plausibly exceed the duration limit
+LONG_AUDIO_CHUNK_SECONDS = 90.0
+LONG_AUDIO_OVERLAP_SECONDS = 1.0
+LONG_AUDIO_CONCURRENCY = 8
+
+# Clips up to this length go to the local model when ASR_LOCAL_MODEL is set
+LOCAL_MAX_SECONDS = 15.0
+
+# Silence gating: a 30ms frame counts as speech when its RMS exceeds the
+# threshold; audio with under 5% speech frames is not sent to the API
+VAD_FRAME_MS = 30
+SPEECH_RMS_THRESHOLD = 500  # ~-36 dBFS for 16-bit PCM
+MIN_SPEECH_RATIO = 0.05
+VAD_SAMPLE_RATE = 16000
+
+
+def speech_ratio(
+    pcm: bytes,
+    sample_rate: int,
+    sample_width: int = 2,
+    decide_at: Optional[float] = None
+) -> float:
+    """
+    Fraction of 30ms frames in mono PCM audio that look like speech.
+    
+    Args:
+        pcm: Mono PCM audio
+        sample_rate: Sample rate in Hz
+        sample_width: Bytes per sample
+        decide_at: Stop scanning as soon as the ratio is known to be above or
+            below this threshold. The result is then a bound on the same side
+            of the threshold as the true ratio, not the exact value.
+        
+    Returns:
+        Ratio between 0.0 and 1.0 (0.0 for empty audio)
+    """
+    frame_bytes = int(sample_rate * VAD_FRAME_MS / 1000) * sample_width
+    total = len(pcm) // frame_bytes
+    if total == 0:
+        return 0.0
+    
+    needed = math.ceil(total * decide_at) if decide_at is not None else None
+    voiced = 0
+    remaining = total
+    for offset in range(0, total * frame_bytes, frame_bytes):
+        remaining -= 1
+        if audioop.rms(pcm[offset:offset + frame_bytes], sample_width) > SPEECH_RMS_THRESHOLD:
+            voiced += 1
+            if needed is not None and voiced >= needed:
+                return voiced / total
+        elif needed is not None and voiced + remaining < needed:
+            return (voiced + remaining) / total
+    return voiced / total
+
+
+def contains_speech(pcm: bytes, sample_rate: int, sample_width: int = 2) -> bool:
+    """
+    Check whether mono PCM audio has enough voiced frames to be worth transcribing.
+    
+    Stops scanning as soon as the answer is decided, so speech is usually
+    detected after the first few seconds instead of a full pass.
+    """
+    ratio = speech_ratio(pcm, sample_rate, sample_width, decide_at=MIN_SPEECH_RATIO)
+    return ratio >= MIN_SPEECH_RATIO
+
+
+def read_wav_pcm(source) -> Optional[Tuple[bytes, int, int]]:
+    """
+    Read a PCM WAV file (path or file-like) as mono PCM.
+    
+    Returns:
+        Tuple of (pcm, sample_rate, sample_width), or None if not a PCM WAV
+    """
+    try:
+        with wave.open(source, "rb") as wav:
+            width = wav.getsampwidth()
+            pcm = wav.readframes(wav.getnframes())
+            if wav.getnchannels() == 2:
+                pcm = audioop.tomono(pcm, width, 0.5, 0.5)
+            elif wav.getnchannels() != 1:
+                return None
+            return pcm, wav.getframerate(), width
+    except (wave.Error, EOFError):
+        return None
+
+
+async def decode_pcm(file_path: Path) -> Optional[Tuple[bytes, int, int]]:
+    """
+    Decode an audio file to mono PCM for silence detection.
+    
+    PCM WAV is read directly; other formats go through ffmpeg (16 kHz s16) when
+    it is installed.
+    
+    Returns:
+        Tuple of (pcm, sample_rate, sample_width), or None if it can't be decoded
+    """
+    decoded = await asyncio.to_thread(read_wav_pcm, str(file_path))
+    if decoded is not None or not FFMPEG_AVAILABLE:
+        return decoded
+    
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-v", "error", "-i", str(file_path),
+        "-ac", "1", "-ar", str(VAD_SAMPLE_RATE), "-f", "s16le", "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    out, _ = await proc.communicate()
+    if proc.returncode != 0:
+        return None
+    return out, VAD_SAMPLE_RATE, 2
+
+
+def _silent_result(pcm: bytes, sample_rate: int, sample_width: int) -> TranscriptionResult:
+    """Empty transcription for audio that contains no speech."""
+    return TranscriptionResult(text="", duration=len(pcm) / (sample_rate * sample_width))
+
+
+async def probe_duration(file_path: Path) -> Optional[float]:
+    """Get audio duration in seconds with ffprobe (None if unavailable)."""
+    if not FFPROBE_AVAILABLE:
+        return None
+    
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(file_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    out, _ = await proc.communicate()
+    try:
+        return float(out.strip())
+    except ValueError:
+        return None
+
+
+def wav_duration(file_path: Path) -> Optional[float]:
+    """Get a WAV file's duration from its header (None if not a readable WAV)."""
+    try:
+        with wave.open(str(file_path), "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+async def audio_duration(file_path: Path) -> Optional[float]:
+    """Get audio duration in seconds: WAV header first, then ffprobe."""
+    if file_path.suffix.lower() == ".wav":
+        duration = await asyncio.to_thread(wav_duration, file_path)
+        if duration is not None:
+            return duration
+    return await probe_duration(file_path)
+
+
+async def extract_segment(file_path: Path, start: float, length: float) -> bytes:
+    """Cut [start, start + length) seconds out of a file as mono 64 kbps MP3."""
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-v", "error",
+        "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+        "-i", str(file_path),
+        "-ac", "1", "-b:a", "64k", "-f", "mp3", "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to extract segment at {start:.1f}s: {err.decode(errors='replace').strip()}")
+    return out
+
+
+def merge_overlapping_text(previous: str, following: str, max_words: int = 8) -> str:
+    """
+    Join two segment transcripts, dropping words repeated across the overlap.
+    
+    Args:
+        previous: Text of the earlier segment
+        following: Text of the next segment
+        max_words: Longest overlap (in words) to look for
+        
+    Returns:
+        Combined text
+    """
+    if not previous:
+        return following
+    if not following:
+        return previous
+    
+    def normalize(word: str) -> str:
+        return word.strip(".,!?;:\"'").lower()
+    
+    prev_words = previous.split()
+    next_words = following.split()
+    tail = [normalize(w) for w in prev_words[-max_words:]]
+    head = [normalize(w) for w in next_words[:max_words]]
+    
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(prev_words + next_words[size:])
+    
+    return f"{previous} {following}"
+
+
+def _response_format(verbose: bool) -> str:
+    """Whisper response format: verbose_json only when segment metadata is wanted."""
+    return "verbose_json" if verbose else "json"
+
+
+def _result_from_response(
+    response,
+    language: Optional[str],
+    speedup: float = 1.0
+) -> TranscriptionResult:
+    """
+    Build a TranscriptionResult from a Whisper API response.
+    
+    Args:
+        response: Transcription object returned by the OpenAI SDK
+        language: Requested language, used when the response has none
+        speedup: Tempo factor applied before upload (scales duration back)
+    """
+    duration = getattr(response, 'duration', None)
+    
+    return TranscriptionResult(
+        text=response.text.strip(),
+        language=getattr(response, 'language', None) or language,
+        duration=duration * speedup if duration else duration,
+        confidence=None  # Whisper API doesn't provide confidence scores
+    )
+
+
 class ASRService:
     """
     Automatic Speech Recognition service.
@@ -38,7 +433,11 @@ class ASRService:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "whisper-1"
+        model: str = "whisper-1",
+        cache: Optional[bool] = None,
+        cache_dir: Optional[str] = None,
+        rpm: Optional[int] = None,
+        local_model: Optional[str] = None
     ):
         """
         Initialize ASR service.
@@ -46,15 +445,77 @@ class ASRService:
         Args:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             model: Whisper model to use (whisper-1 for API)
+            cache: Reuse results for identical audio (defaults to ASR_CACHE env var)
+            cache_dir: Cache directory (defaults to ASR_CACHE_DIR env var)
+            rpm: Max Whisper requests per minute (defaults to OPENAI_RPM env var, 0 = unlimited)
+            local_model: faster-whisper model for short English clips, e.g. "small.en"
+                (defaults to ASR_LOCAL_MODEL env var; unset = always use the API)
         """
-        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        if cache is None:
+            cache = os.getenv("ASR_CACHE", "false").lower() == "true"
+        self.cache_dir = Path(cache_dir) if cache_dir else ASR_CACHE_DIR
+        self.cache_enabled = cache
+        
+        # One pooled HTTP client for both Whisper API calls and audio downloads
+        self.http_client = httpx.AsyncClient(http2=True, limits=ASR_HTTP_LIMITS)
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            http_client=self.http_client
+        )
         self.model = model
+        
+        # Pace API calls under the account's rate limit instead of retrying on 429s
+        if rpm is None:
+            rpm = int(os.getenv("OPENAI_RPM") or 0)
+        self.limiter = AsyncRateLimiter(max_rate=rpm, time_period=60) if rpm > 0 else None
+        
+        # Local model is loaded on first use (model load takes seconds)
+        self.local_model_name = local_model or os.getenv("ASR_LOCAL_MODEL") or None
+        if self.local_model_name and not FASTER_WHISPER_AVAILABLE:
+            logger.warning("⚠️  faster-whisper not available, using the API only. Install with: pip install faster-whisper")
+            self.local_model_name = None
+        self.local_enabled = self.local_model_name is not None
+        self._local_model = None
+        self._local_model_lock = threading.Lock()
+    
+    async def warmup(self, timeout: float = 2.0) -> bool:
+        """
+        Open a pooled connection to the API so the first transcription skips DNS/TLS setup.
+        
+        Args:
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            True if the API answered, False otherwise (failures are not fatal)
+        """
+        try:
+            await self.client.with_options(timeout=timeout, max_retries=0).models.list()
+            return True
+        except Exception as e:
+            logger.warning("⚠️  ASR warmup skipped: %s", e)
+            return False
+    
+    async def aclose(self) -> None:
+        """Close the pooled API connections (call once on shutdown)."""
+        await self.http_client.aclose()
+    
+    async def _create_transcription(self, **kwargs):
+        """Call the Whisper API, waiting for a rate-limit token when OPENAI_RPM is set."""
+        if self.limiter is None:
+            return await self.client.audio.transcriptions.create(**kwargs)
+        
+        async with self.limiter:
+            return await self.client.audio.transcriptions.create(**kwargs)
     
     async def transcribe_file(
         self,
         audio_file_path: str,
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        preprocess: bool = True,
+        speedup: float = 1.0,
+        skip_if_silent: bool = False,
+        verbose: bool = False
     ) -> TranscriptionResult:
         """
         Transcribe an audio file to text.
@@ -63,6 +524,12 @@ class ASRService:
             audio_file_path: Path to audio file (.wav, .mp3, .m4a, .webm, etc.)
             language: ISO-639-1 language code (e.g., 'en', 'hi') - optional, improves accuracy
             prompt: Optional text to guide the model's style or continue a previous segment
+            preprocess: Compress to mono 64 kbps MP3 with ffmpeg first (if installed)
+            speedup: Tempo factor applied during preprocessing (2.0 = half the audio minutes);
+                the returned duration is scaled back to the original timeline
+            skip_if_silent: Return an empty transcript without calling the API when
+                the audio has no detectable speech
+            verbose: Request verbose_json so detected language and duration are filled in
             
         Returns:
             TranscriptionResult with text and metadata
@@ -72,35 +539,180 @@ class ASRService:
         if not file_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
         
+        if skip_if_silent:
+            decoded = await decode_pcm(file_path)
+            if decoded is not None and not contains_speech(*decoded):
+                logger.debug("🔇 No speech detected in %s, skipping transcription", file_path.name)
+                return _silent_result(*decoded)
+        
+        if not self.cache_enabled:
+            return await self._transcribe_file_uncached(
+                file_path, language, prompt, preprocess, speedup, verbose
+            )
+        
+        digest = await asyncio.to_thread(hash_file, file_path)
+        cache_key = self._cache_key(digest, language, prompt, speedup if preprocess else 1.0, verbose)
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = await self._transcribe_file_uncached(
+            file_path, language, prompt, preprocess, speedup, verbose
+        )
+        await self._cache_put(cache_key, result)
+        return result
+    
+    async def _transcribe_file_uncached(
+        self,
+        file_path: Path,
+        language: Optional[str],
+        prompt: Optional[str],
+        preprocess: bool,
+        speedup: float,
+        verbose: bool
+    ) -> TranscriptionResult:
+        """Transcribe a file without consulting the cache (see transcribe_file)."""
+        # Split long recordings into parallel segments
+        if FFMPEG_AVAILABLE:
+            size = file_path.stat().st_size
+            duration = await probe_duration(file_path) if size > LONG_AUDIO_PROBE_BYTES else None
+            if duration and (size > LONG_AUDIO_MAX_BYTES or duration > LONG_AUDIO_MAX_SECONDS):
+                return await self._transcribe_long(file_path, duration, language, prompt, verbose)
+        
+        # Short English clips: skip the network round trip
+        if self.local_enabled and language in (None, "en"):
+            duration = await audio_duration(file_path)
+            if duration is not None and duration <= LOCAL_MAX_SECONDS:
+                try:
+                    return await asyncio.to_thread(self._transcribe_local, file_path, language, prompt)
+                except Exception as e:
+                    logger.warning("⚠️  Local transcription failed, falling back to API: %s", e)
+        
         try:
-            with open(file_path, "rb") as audio_file:
-                # Call OpenAI Whisper API
-                response = await self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file,
-                    language=language,
-                    prompt=prompt,
-                    response_format="verbose_json"  # Get detailed info
-                )
+            upload_name = file_path.name
+            audio_bytes = await preprocess_audio(file_path, speedup) if preprocess else None
             
-            # Parse response
-            return TranscriptionResult(
-                text=response.text.strip(),
-                language=response.language if hasattr(response, 'language') else language,
-                duration=response.duration if hasattr(response, 'duration') else None,
-                confidence=None  # Whisper API doesn't provide confidence scores
+            if audio_bytes is not None:
+                upload_name = f"{file_path.stem}.mp3"
+            else:
+                speedup = 1.0  # Original audio is uploaded unchanged
+                
+                # Read without blocking the event loop
+                async with aiofiles.open(file_path, "rb") as f:
+                    audio_bytes = await f.read()
+            
+            # Call OpenAI Whisper API
+            response = await self._create_transcription(
+                model=self.model,
+                file=(upload_name, audio_bytes),
+                language=language,
+                prompt=prompt,
+                response_format=_response_format(verbose)
             )
             
+            return _result_from_response(response, language, speedup)
+            
         except Exception as e:
-            print(f"❌ Error transcribing audio: {e}")
+            logger.exception("❌ Error transcribing audio: %s", e)
             raise
     
+    def _transcribe_local(
+        self,
+        file_path: Path,
+        language: Optional[str],
+        prompt: Optional[str]
+    ) -> TranscriptionResult:
+        """Transcribe with the local faster-whisper model (blocking; run in a thread)."""
+        with self._local_model_lock:
+            if self._local_model is None:
+                self._local_model = WhisperModel(
+                    self.local_model_name, device="cpu", compute_type="int8"
+                )
+        
+        segments, info = self._local_model.transcribe(
+            str(file_path),
+            language=language,
+            initial_prompt=prompt,
+            beam_size=1,
+            vad_filter=True
+        )
+        
+        return TranscriptionResult(
+            text="".join(segment.text for segment in segments).strip(),
+            language=info.language or language,
+            duration=info.duration,
+            confidence=None
+        )
+    
+    async def _transcribe_long(
+        self,
+        file_path: Path,
+        duration: float,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        verbose: bool = False,
+        chunk_seconds: float = LONG_AUDIO_CHUNK_SECONDS,
+        overlap_seconds: float = LONG_AUDIO_OVERLAP_SECONDS
+    ) -> TranscriptionResult:
+        """
+        Transcribe a long file as fixed-length overlapping segments in parallel.
+        
+        Args:
+            file_path: Audio file
+            duration: File duration in seconds (from ffprobe)
+            language: ISO-639-1 language code
+            prompt: Optional guidance text (applied to every segment)
+            verbose: Request verbose_json for each segment
+            chunk_seconds: Segment length
+            overlap_seconds: Audio shared between consecutive segments
+            
+        Returns:
+            TranscriptionResult with segment texts stitched in order
+        """
+        starts: List[float] = []
+        start = 0.0
+        while True:
+            starts.append(start)
+            start += chunk_seconds - overlap_seconds
+            if start + overlap_seconds >= duration:
+                break
+        
+        logger.info("✂️  Splitting %s (%.0fs) into %d segments", file_path.name, duration, len(starts))
+        
+        semaphore = asyncio.Semaphore(LONG_AUDIO_CONCURRENCY)
+        
+        async def run(index: int, segment_start: float) -> TranscriptionResult:
+            async with semaphore:
+                segment = await extract_segment(file_path, segment_start, chunk_seconds)
+                return await self.transcribe_bytes(
+                    segment,
+                    filename=f"{file_path.stem}_{index:03d}.mp3",
+                    language=language,
+                    prompt=prompt,
+                    verbose=verbose
+                )
+        
+        segments = await asyncio.gather(*(run(i, t) for i, t in enumerate(starts)))
+        
+        text = ""
+        for segment in segments:
+            text = merge_overlapping_text(text, segment.text)
+        
+        return TranscriptionResult(
+            text=text,
+            language=segments[0].language if segments else language,
+            duration=duration,
+            confidence=None
+        )
+    
     async def transcribe_bytes(
         self,
         audio_bytes: bytes,
         filename: str = "audio.wav",
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        skip_if_silent: bool = False,
+        verbose: bool = False
     ) -> TranscriptionResult:
         """
         Transcribe audio from bytes (useful for streaming or API uploads).
@@ -110,41 +722,139 @@ class ASRService:
             filename: Filename to use (must have proper extension)
             language: ISO-639-1 language code
             prompt: Optional guidance text
+            skip_if_silent: Return an empty transcript without calling the API when
+                the audio is a PCM WAV with no detectable speech
+            verbose: Request verbose_json so detected language and duration are filled in
             
         Returns:
             TranscriptionResult with text and metadata
         """
+        if skip_if_silent:
+            decoded = read_wav_pcm(BytesIO(audio_bytes))
+            if decoded is not None and not contains_speech(*decoded):
+                return _silent_result(*decoded)
+        
+        cache_key = None
+        if self.cache_enabled:
+            cache_key = self._cache_key(
+                hash_bytes(audio_bytes), language, prompt, verbose=verbose
+            )
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             # Create a file-like object from bytes
-            from io import BytesIO
             audio_file = BytesIO(audio_bytes)
             audio_file.name = filename
             
             # Call OpenAI Whisper API
-            response = await self.client.audio.transcriptions.create(
+            response = await self._create_transcription(
                 model=self.model,
                 file=audio_file,
                 language=language,
                 prompt=prompt,
-                response_format="verbose_json"
+                response_format=_response_format(verbose)
             )
             
-            return TranscriptionResult(
-                text=response.text.strip(),
-                language=response.language if hasattr(response, 'language') else language,
-                duration=response.duration if hasattr(response, 'duration') else None,
-                confidence=None
-            )
+            result = _result_from_response(response, language)
             
         except Exception as e:
-            print(f"❌ Error transcribing audio bytes: {e}")
+            logger.exception("❌ Error transcribing audio bytes: %s", e)
             raise
+        
+        if cache_key:
+            await self._cache_put(cache_key, result)
+        return result
+    
+    async def transcribe_chunks(
+        self,
+        audio_chunks: AsyncIterator[bytes],
+        filename: str = "audio.wav",
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        verbose: bool = False
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio that arrives as a stream of byte chunks (e.g. an HTTP download).
+        
+        Chunks are spooled to memory up to SPOOL_MAX_BYTES and to a temp file
+        beyond that, so the full recording is never held as one bytes object.
+        Whisper needs the complete file, so the upload starts when the stream ends.
+        
+        Args:
+            audio_chunks: Async iterator yielding audio file bytes
+            filename: Filename to use (must have proper extension)
+            language: ISO-639-1 language code
+            prompt: Optional guidance text
+            verbose: Request verbose_json so detected language and duration are filled in
+            
+        Returns:
+            TranscriptionResult with text and metadata
+        """
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+                async for chunk in audio_chunks:
+                    spool.write(chunk)
+                spool.seek(0)
+                
+                # Call OpenAI Whisper API
+                response = await self._create_transcription(
+                    model=self.model,
+                    file=(filename, spool),
+                    language=language,
+                    prompt=prompt,
+                    response_format=_response_format(verbose)
+                )
+            
+            return _result_from_response(response, language)
+            
+        except Exception as e:
+            logger.exception("❌ Error transcribing audio stream: %s", e)
+            raise
+    
+    def _cache_key(
+        self,
+        digest: str,
+        language: Optional[str],
+        prompt: Optional[str],
+        speedup: float = 1.0,
+        verbose: bool = False
+    ) -> str:
+        """Cache key for audio content plus every option that affects the result."""
+        raw = f"{digest}:{self.model}:{self.local_model_name}:{language}:{prompt}:{speedup}:{_response_format(verbose)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    async def _cache_get(self, key: str) -> Optional[TranscriptionResult]:
+        """Load a cached result, or None on miss."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            async with aiofiles.open(path, "rb") as f:
+                return TranscriptionResult(**orjson.loads(await f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("⚠️  Ignoring unreadable ASR cache entry %s: %s", path.name, e)
+            return None
+    
+    async def _cache_put(self, key: str, result: TranscriptionResult) -> None:
+        """Store a result (written to a temp file, then renamed into place)."""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(orjson.dumps(result))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("⚠️  Could not write ASR cache entry: %s", e)
     
     async def transcribe_url(
         self,
         audio_url: str,
         language: Optional[str] = None,
-        prompt: Optional[str] = None
+        prompt: Optional[str] = None,
+        verbose: bool = False
     ) -> TranscriptionResult:
         """
         Transcribe audio from a URL.
@@ -153,33 +863,62 @@ class ASRService:
             audio_url: URL to audio file
             language: ISO-639-1 language code
             prompt: Optional guidance text
+            verbose: Request verbose_json so detected language and duration are filled in
             
         Returns:
             TranscriptionResult with text and metadata
         """
         try:
-            # Download audio from URL
-            async with httpx.AsyncClient() as client:
-                response = await client.get(audio_url)
-                response.raise_for_status()
-                audio_bytes = response.content
-            
             # Determine filename from URL
             filename = Path(audio_url).name or "audio.wav"
             
-            # Transcribe
-            return await self.transcribe_bytes(
-                audio_bytes,
-                filename=filename,
-                language=language,
-                prompt=prompt
-            )
+            # Stream the download into a spooled upload buffer
+            async with self.http_client.stream("GET", audio_url) as response:
+                response.raise_for_status()
+                return await self.transcribe_chunks(
+                    response.aiter_bytes(65536),
+                    filename=filename,
+                    language=language,
+                    prompt=prompt,
+                    verbose=verbose
+                )
             
         except Exception as e:
-            print(f"❌ Error downloading/transcribing audio from URL: {e}")
+            logger.exception("❌ Error downloading/transcribing audio from URL: %s", e)
             raise
 
 
+# Process-wide default instance (shares one connection pool)
+_default_asr: Optional[ASRService] = None
+_default_asr_lock = threading.Lock()
+
+
+def get_default_asr() -> ASRService:
+    """Get the shared ASRService, creating it on first use."""
+    global _default_asr
+    
+    if _default_asr is None:
+        with _default_asr_lock:
+            if _default_asr is None:
+                _default_asr = ASRService()
+    return _default_asr
+
+
+async def close_default_asr() -> None:
+    """
+    Close the shared ASRService's connections, if it was ever created.
+    
+    The next get_default_asr() call builds a fresh service, so a restarted
+    app in the same process never gets a closed client.
+    """
+    global _default_asr
+    
+    with _default_asr_lock:
+        asr, _default_asr = _default_asr, None
+    if asr is not None:
+        await asr.aclose()
+
+
 # Utility function for common use case
 async def transcribe(
     audio_source: str,
@@ -197,7 +936,7 @@ async def transcribe(
     Returns:
         Transcribed text string
     """
-    asr = ASRService()
+    asr = get_default_asr()
     
     # Detect if URL or file path
     if audio_source.startswith(("http://", "https://")):
@@ -265,16 +1004,23 @@ class StreamingASRService:
                 await transcripts.put((sentence, is_final))
         
         async def on_error(self, error, **kwargs):
-            print(f"❌ Deepgram error: {error}")
+            logger.error("❌ Deepgram error: %s", error)
+        
+        async def on_close(self, close=None, **kwargs):
+            await transcripts.put(_STREAM_DONE)
         
         # Register event handlers
         connection.on(LiveTranscriptionEvents.Transcript, on_message)
         connection.on(LiveTranscriptionEvents.Error, on_error)
+        connection.on(LiveTranscriptionEvents.Close, on_close)
         
         # Configure options
         options = LiveOptions(
             language=language,
             model="nova-2",  # Latest Deepgram model
+            encoding="linear16",  # Raw PCM from the media stream
+            sample_rate=8000,
+            channels=1,
             punctuate=True,
             interim_results=interim_results,
             endpointing=300,  # 300ms of silence = end of utterance
@@ -282,50 +1028,48 @@ class StreamingASRService:
             smart_format=True
         )
         
+        send_task = None
+        
         try:
             # Start connection
             if not await connection.start(options):
                 raise Exception("Failed to start Deepgram connection")
             
-            # Send audio chunks
+            # Send audio chunks, coalesced into ~100ms frames. send() awaits the
+            # websocket write, so backpressure comes from the socket itself.
             async def send_audio():
                 try:
+                    buffer = bytearray()
                     async for chunk in audio_stream:
-                        connection.send(chunk)
-                        await asyncio.sleep(0.01)  # Small delay to avoid overwhelming
+                        buffer += chunk
+                        if len(buffer) >= STREAM_SEND_BYTES:
+                            await connection.send(bytes(buffer))
+                            buffer.clear()
+                    
+                    if buffer:
+                        await connection.send(bytes(buffer))
                     
-                    # Signal end of stream
+                    # Signal end of stream (Deepgram flushes remaining results, then closes)
                     await connection.finish()
                 except Exception as e:
-                    print(f"❌ Error sending audio: {e}")
+                    logger.exception("❌ Error sending audio: %s", e)
+                finally:
+                    await transcripts.put(_STREAM_DONE)
             
             # Start sending audio in background
             send_task = asyncio.create_task(send_audio())
             
-            # Yield transcripts as they arrive
+            # Yield transcripts as they arrive, until the stream closes
             while True:
-                try:
-                    # Wait for transcript with timeout
-                    transcript, is_final = await asyncio.wait_for(
-                        transcripts.get(),
-                        timeout=5.0
-                    )
-                    yield (transcript, is_final)
-                    
-                    # If final, check if stream is done
-                    if is_final and send_task.done():
-                        # Wait a bit for any remaining transcripts
-                        await asyncio.sleep(0.5)
-                        if transcripts.empty():
-                            break
-                
-                except asyncio.TimeoutError:
-                    # No transcript for 5 seconds, check if done
-                    if send_task.done():
-                        break
+                item = await transcripts.get()
+                if item is _STREAM_DONE:
+                    break
+                yield item
         
         finally:
             # Clean up
+            if send_task is not None and not send_task.done():
+                send_task.cancel()
             await connection.finish()
     
     async def transcribe_stream_simple(
@@ -374,23 +1118,23 @@ class MockStreamingASR:
         In a real scenario, this would analyze audio.
         For testing, we just yield mock transcripts.
         """
-        # Consume audio stream
-        audio_chunks = []
+        # Consume audio stream (only the chunk count matters)
+        chunk_count = 0
         async for chunk in audio_stream:
-            audio_chunks.append(chunk)
+            chunk_count += 1
             
             # Simulate processing delay
             await asyncio.sleep(0.02)  # 20ms per chunk
             
             # Every 50 chunks (~1 second), yield interim result
-            if interim_results and len(audio_chunks) % 50 == 0:
+            if interim_results and chunk_count % 50 == 0:
                 yield ("User is speaking...", False)
         
         # Simulate final transcription delay
         await asyncio.sleep(0.5)
         
         # Yield final result based on audio duration
-        duration_seconds = len(audio_chunks) * 0.02
+        duration_seconds = chunk_count * 0.02
         
         if duration_seconds < 1:
             yield ("Hello", True)
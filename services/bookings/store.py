@@ -5,11 +5,43 @@ Manages appointment bookings with SQLite storage.
 
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from dataclasses import dataclass, asdict
 from datetime import datetime
 import sqlite3
+import threading
 from pathlib import Path
 import json
 
+# Applied once per connection: WAL lets readers run alongside the writer and
+# synchronous=NORMAL fsyncs at checkpoints instead of on every commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+# One fixed statement text so the connection's prepared-statement cache always hits
+_INSERT_BOOKING_SQL = (
+    "INSERT INTO bookings (customer_name, customer_phone, appointment_date, "
+    "appointment_time, notes, status, created_at, session_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Reads name their columns so rows come back as plain tuples in this order
+_BOOKING_COLUMNS = (
+    "booking_id", "customer_name", "customer_phone", "appointment_date",
+    "appointment_time", "notes", "status", "created_at", "session_id",
+)
+_SELECT_BOOKINGS_SQL = f"SELECT {', '.join(_BOOKING_COLUMNS)} FROM bookings"
+
+# UPDATE ... RETURNING needs SQLite 3.35+
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_UPDATE_STATUS_RETURNING_SQL = (
+    f"UPDATE bookings SET status = ? WHERE booking_id = ? RETURNING {', '.join(_BOOKING_COLUMNS)}"
+)
+
 
 class Booking(BaseModel):
     """Appointment booking model."""
@@ -22,12 +54,57 @@ class Booking(BaseModel):
     status: str = "confirmed"  # confirmed, cancelled, completed
     created_at: Optional[str] = None
     session_id: Optional[str] = None
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> "Booking":
+        """Build a Booking from a stored row without re-validating it (validated on insert)."""
+        return cls.model_construct(**dict(zip(_BOOKING_COLUMNS, row)))
+
+
+@dataclass(slots=True, frozen=True)
+class BookingRow:
+    """
+    Stored booking as a plain slotted record, for internal bulk reads.
+    
+    Fields follow _BOOKING_COLUMNS, so a selected row unpacks directly:
+    BookingRow(*row). Convert with to_booking() at the API boundary.
+    """
+    booking_id: int
+    customer_name: str
+    customer_phone: str
+    appointment_date: str
+    appointment_time: str
+    notes: Optional[str]
+    status: str
+    created_at: str
+    session_id: Optional[str]
+    
+    def to_booking(self) -> Booking:
+        """Convert to the pydantic Booking model (no re-validation)."""
+        return Booking.model_construct(**asdict(self))
+
+
+def _insert_params(booking: Booking, created_at: str) -> tuple:
+    """Bind values for _INSERT_BOOKING_SQL."""
+    return (
+        booking.customer_name,
+        booking.customer_phone,
+        booking.appointment_date,
+        booking.appointment_time,
+        booking.notes,
+        booking.status,
+        created_at,
+        booking.session_id
+    )
 
 
 class BookingStore:
     """
     SQLite-based storage for bookings.
     Simple CRUD operations for MVP.
+    
+    Holds one connection for its lifetime (autocommit, guarded by a lock so
+    it can be shared with worker threads).
     """
     
     def __init__(self, db_path: str = "data/zylin.db"):
@@ -37,13 +114,23 @@ class BookingStore:
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        for pragma in SQLITE_PRAGMAS:
+            self._conn.execute(pragma)
+        
         # Initialize database
         self._init_db()
     
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
     def _init_db(self):
-        """Create bookings table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        """Create bookings table and its indexes if they don't exist."""
+        with self._lock:
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS bookings (
                     booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
                     customer_name TEXT NOT NULL,
@@ -56,7 +143,25 @@ class BookingStore:
                     session_id TEXT
                 )
             """)
-            conn.commit()
+            
+            # list_bookings filters by status/date and orders by date, time
+            existing = {
+                row[0] for row in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'bookings'"
+                )
+            }
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bookings_date_time
+                ON bookings(appointment_date, appointment_time)
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_bookings_status_date
+                ON bookings(status, appointment_date, appointment_time)
+            """)
+            
+            # Gather planner statistics once, when the indexes are first built
+            if not {"idx_bookings_date_time", "idx_bookings_status_date"} <= existing:
+                self._conn.execute("ANALYZE bookings")
     
     def create_booking(self, booking: Booking) -> Booking:
         """
@@ -68,41 +173,66 @@ class BookingStore:
         Returns:
             Booking with assigned booking_id
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                INSERT INTO bookings (
-                    customer_name, customer_phone, appointment_date,
-                    appointment_time, notes, status, created_at, session_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                booking.customer_name,
-                booking.customer_phone,
-                booking.appointment_date,
-                booking.appointment_time,
-                booking.notes,
-                booking.status,
-                datetime.now().isoformat(),
-                booking.session_id
-            ))
-            conn.commit()
-            booking.booking_id = cursor.lastrowid
-            booking.created_at = datetime.now().isoformat()
+        created_at = datetime.now().isoformat()
+        
+        with self._lock:
+            cursor = self._conn.execute(_INSERT_BOOKING_SQL, _insert_params(booking, created_at))
         
+        booking.booking_id = cursor.lastrowid
+        booking.created_at = created_at
         return booking
     
+    def bulk_create_bookings(self, bookings: List[Booking]) -> List[Booking]:
+        """
+        Create many bookings in a single transaction.
+        
+        Every row reuses the same cached prepared INSERT inside one
+        transaction, so a batch costs one commit instead of one per booking.
+        
+        Args:
+            bookings: Booking data (booking_ids will be auto-assigned)
+            
+        Returns:
+            The same bookings with booking_id and created_at filled in
+        """
+        if not bookings:
+            return bookings
+        
+        created_at = datetime.now().isoformat()
+        
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Read each id back from its own insert rather than assuming
+                # the batch got a consecutive range
+                for booking in bookings:
+                    cursor = self._conn.execute(
+                        _INSERT_BOOKING_SQL,
+                        _insert_params(booking, created_at)
+                    )
+                    booking.booking_id = cursor.lastrowid
+                    booking.created_at = created_at
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                for booking in bookings:
+                    booking.booking_id = None
+                    booking.created_at = None
+                raise
+        
+        return bookings
+    
     def get_booking(self, booking_id: int) -> Optional[Booking]:
         """Get a booking by ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                "SELECT * FROM bookings WHERE booking_id = ?",
+        with self._lock:
+            row = self._conn.execute(
+                _SELECT_BOOKINGS_SQL + " WHERE booking_id = ?",
                 (booking_id,)
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return Booking(**dict(row))
-            return None
+            ).fetchone()
+        
+        if row:
+            return Booking.from_row(row)
+        return None
     
     def list_bookings(
         self,
@@ -121,7 +251,30 @@ class BookingStore:
         Returns:
             List of bookings
         """
-        query = "SELECT * FROM bookings WHERE 1=1"
+        return [Booking.from_row(row) for row in self._select_bookings(status, date, limit)]
+    
+    def list_booking_rows(
+        self,
+        status: Optional[str] = None,
+        date: Optional[str] = None,
+        limit: int = 100
+    ) -> List[BookingRow]:
+        """
+        List bookings as BookingRow records (same filters as list_bookings).
+        
+        Cheaper than list_bookings for large internal reads that don't need
+        pydantic models.
+        """
+        return [BookingRow(*row) for row in self._select_bookings(status, date, limit)]
+    
+    def _select_bookings(
+        self,
+        status: Optional[str],
+        date: Optional[str],
+        limit: int
+    ) -> List[tuple]:
+        """Run the filtered bookings query and return raw rows."""
+        query = _SELECT_BOOKINGS_SQL + " WHERE 1=1"
         params = []
         
         if status:
@@ -135,36 +288,38 @@ class BookingStore:
         query += " ORDER BY appointment_date, appointment_time LIMIT ?"
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-            
-            return [Booking(**dict(row)) for row in rows]
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
     
     def update_booking_status(
         self,
         booking_id: int,
         status: str
     ) -> Optional[Booking]:
-        """Update booking status."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "UPDATE bookings SET status = ? WHERE booking_id = ?",
+        """Update booking status (None if the booking doesn't exist)."""
+        with self._lock:
+            if not SQLITE_HAS_RETURNING:
+                self._conn.execute(
+                    "UPDATE bookings SET status = ? WHERE booking_id = ?",
+                    (status, booking_id)
+                )
+                return self.get_booking(booking_id)
+            
+            # fetchall() steps the statement to completion so the autocommit write is finalized
+            rows = self._conn.execute(
+                _UPDATE_STATUS_RETURNING_SQL,
                 (status, booking_id)
-            )
-            conn.commit()
+            ).fetchall()
         
-        return self.get_booking(booking_id)
+        return Booking.from_row(rows[0]) if rows else None
     
     def delete_booking(self, booking_id: int) -> bool:
         """Delete a booking."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        with self._lock:
+            cursor = self._conn.execute(
                 "DELETE FROM bookings WHERE booking_id = ?",
                 (booking_id,)
             )
-            conn.commit()
             return cursor.rowcount > 0
 
 
@@ -175,6 +330,9 @@ class BookingTool:
     Acts as bridge between conversation and database.
     """
     
+    # Conversation fields that must be present (and non-empty) to book
+    _REQUIRED: tuple[str, ...] = ("name", "phone", "date", "time")
+    
     def __init__(self, store: Optional[BookingStore] = None):
         """Initialize booking tool."""
         self.store = store or BookingStore()
@@ -186,8 +344,7 @@ class BookingTool:
         Returns:
             (is_valid, error_message)
         """
-        required = ["name", "phone", "date", "time"]
-        missing = [f for f in required if not booking_data.get(f)]
+        missing = [f for f in self._REQUIRED if not booking_data.get(f)]
         
         if missing:
             return False, f"Missing required fields: {', '.join(missing)}"
@@ -3,12 +3,18 @@ Zylin LLM Brain Service
 Handles conversation management, intent classification, and response generation.
 """
 
-from typing import Optional, Literal
-from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
-from openai import AsyncOpenAI
+from typing import Callable, Optional, Literal, Set, Tuple
+from collections import OrderedDict
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import chain
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from openai import AsyncOpenAI, AsyncStream
+import asyncio
 import os
 import json
+import re
+import threading
 
 
 # Response Models
@@ -23,16 +29,18 @@ class ExtractedData(BaseModel):
 
 
 class ConversationResponse(BaseModel):
-    """LLM response with intent and extracted data."""
-    intent: Literal["faq", "booking", "urgent", "other"]
-    message: str
-    extracted_data: ExtractedData
+    """LLM response with intent and extracted data (defaults cover fields the LLM omits)."""
+    intent: Literal["faq", "booking", "urgent", "other"] = "other"
+    message: str = "I apologize, I didn't quite understand that. Could you please rephrase?"
+    extracted_data: ExtractedData = Field(default_factory=ExtractedData)
     booking_complete: bool = False
     needs_escalation: bool = False
 
 
 class BusinessContext(BaseModel):
-    """Business information for context."""
+    """Business information for context (immutable so prompts can be cached per context)."""
+    model_config = ConfigDict(frozen=True)
+    
     business_name: str
     business_type: str
     phone: str
@@ -76,43 +84,23 @@ DEFAULT_BUSINESS_CONTEXT = BusinessContext(
 )
 
 
-class ZylinBrain:
-    """
-    Core LLM brain for Zylin.
-    Manages conversations, classifies intents, and extracts structured data.
-    """
-    
-    def __init__(
-        self,
-        api_key: Optional[str] = None,
-        model: str = "gpt-4-turbo-preview",
-        business_context: Optional[BusinessContext] = None
-    ):
-        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
-        self.model = model
-        self.business_context = business_context or DEFAULT_BUSINESS_CONTEXT
-        self.system_prompt = self._build_system_prompt()
-    
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt with business context."""
-        today = datetime.now().strftime("%A, %B %d, %Y")
-        
-        return f"""You are Zylin, a professional AI receptionist for {self.business_context.business_name}. Today is {today}.
+# System prompt: business details are rendered once per context, dates per call
+SYSTEM_PROMPT_TEMPLATE = """You are Zylin, a professional AI receptionist for {name}. Today is {today}.
 
 **Business Information:**
-- Name: {self.business_context.business_name}
-- Type: {self.business_context.business_type}
-- Phone: {self.business_context.phone}
-- Address: {self.business_context.address}
+- Name: {name}
+- Type: {business_type}
+- Phone: {phone}
+- Address: {address}
 
 **Hours:**
-{json.dumps(self.business_context.hours, indent=2)}
+{hours}
 
 **Services:**
-{', '.join(self.business_context.services)}
+{services}
 
 **Pricing:**
-{json.dumps(self.business_context.pricing, indent=2)}
+{pricing}
 
 **Your Role:**
 1. Answer caller questions (FAQs) clearly and concisely
@@ -162,18 +150,234 @@ You MUST respond in JSON format with this structure:
 }}
 
 **Date Parsing Examples:**
-- "tomorrow" → {(datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")}
-- "day after tomorrow" → {(datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")}
+- "tomorrow" → {tomorrow}
+- "day after tomorrow" → {day_after}
 - "next Tuesday" → calculate the next Tuesday from today
 - "Friday" → calculate the next Friday from today
 
 Always respond naturally in the "message" field while providing structured data in the other fields.
 """
+
+_DATE_SLOT = "\x00"
+
+
+@lru_cache(maxsize=8)
+def _system_prompt_parts(context_json: str) -> Tuple[str, ...]:
+    """
+    Render the business-specific part of the system prompt.
+    
+    Args:
+        context_json: Serialized BusinessContext (the cache key)
+        
+    Returns:
+        Prompt text split around the today/tomorrow/day-after date slots
+    """
+    context = BusinessContext.model_validate_json(context_json)
+    rendered = SYSTEM_PROMPT_TEMPLATE.format(
+        name=context.business_name,
+        business_type=context.business_type,
+        phone=context.phone,
+        address=context.address,
+        hours=json.dumps(context.hours, indent=2),
+        services=", ".join(context.services),
+        pricing=json.dumps(context.pricing, indent=2),
+        today=_DATE_SLOT,
+        tomorrow=_DATE_SLOT,
+        day_after=_DATE_SLOT
+    )
+    return tuple(rendered.split(_DATE_SLOT))
+
+
+# Opening-question FAQ replies cached per brain (0 disables)
+FAQ_CACHE_SIZE = int(os.getenv("FAQ_CACHE_SIZE", "256"))
+_WHITESPACE = re.compile(r"\s+")
+
+# Budget for reading the rest of a reply stream after its JSON object closes
+STREAM_DRAIN_SECONDS = 0.5
+STREAM_DRAIN_MAX_EVENTS = 32
+
+
+def normalize_question(text: str) -> str:
+    """Normalize a caller message for FAQ cache lookups (case, spacing, end punctuation)."""
+    return _WHITESPACE.sub(" ", text.lower()).strip().rstrip("?.! ")
+
+
+@lru_cache(maxsize=1)
+def _date_tokens(today: date) -> Tuple[str, str, str]:
+    """Formatted today/tomorrow/day-after strings (recomputed when the date changes)."""
+    return (
+        today.strftime("%A, %B %d, %Y"),
+        (today + timedelta(days=1)).strftime("%Y-%m-%d"),
+        (today + timedelta(days=2)).strftime("%Y-%m-%d"),
+    )
+
+
+def _fallback_response() -> ConversationResponse:
+    """Reply used when the LLM call or its output fails."""
+    return ConversationResponse(
+        intent="other",
+        message="I apologize, I'm having trouble processing that right now. Could you please try again?",
+        extracted_data=ExtractedData(),
+        booking_complete=False,
+        needs_escalation=False
+    )
+
+
+_JSON_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonObjectScanner:
+    """
+    Incrementally finds where a streamed top-level JSON object ends.
+    
+    Tracks brace depth outside of strings; feed() returns the offset just
+    past the closing brace once the object is complete. If stream_field is
+    set, the decoded text of that top-level string field is passed to
+    on_field_text as it arrives (once per feed() call that contains any).
+    """
+    
+    def __init__(
+        self,
+        stream_field: Optional[str] = None,
+        on_field_text: Optional[Callable[[str], None]] = None
+    ):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.stream_field = stream_field
+        self.on_field_text = on_field_text
+        self._expect_key = False
+        self._key: Optional[list] = None   # chars of the top-level key being read
+        self._last_key: Optional[str] = None
+        self._capturing = False
+        self._unicode: Optional[str] = None  # hex digits of a pending \u escape
+    
+    def feed(self, text: str) -> Optional[int]:
+        """
+        Scan the next piece of streamed text.
+        
+        Returns:
+            End offset within text if the object closed in it, else None
+        """
+        field_text = []
+        end = None
+        for index, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                    if self._capturing:
+                        if char == "u":
+                            self._unicode = ""
+                        else:
+                            field_text.append(_JSON_ESCAPES.get(char, char))
+                elif self._unicode is not None:
+                    self._unicode += char
+                    if len(self._unicode) == 4:
+                        try:
+                            code = int(self._unicode, 16)
+                        except ValueError:
+                            code = 0xD800
+                        # Surrogate halves (emoji) aren't speakable text
+                        if not 0xD800 <= code <= 0xDFFF:
+                            field_text.append(chr(code))
+                        self._unicode = None
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self._capturing = False
+                    if self._key is not None:
+                        self._last_key = "".join(self._key)
+                        self._key = None
+                elif self._key is not None:
+                    self._key.append(char)
+                elif self._capturing:
+                    field_text.append(char)
+            elif char == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    if self._expect_key:
+                        self._key = []
+                        self._expect_key = False
+                    elif self.stream_field is not None and self._last_key == self.stream_field:
+                        self._capturing = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+                self._expect_key = self.depth == 1
+            elif char == "," and self.depth == 1:
+                self._expect_key = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    end = index + 1
+                    break
+        
+        if field_text and self.on_field_text is not None:
+            self.on_field_text("".join(field_text))
+        return end
+
+
+async def _drain_stream(stream: AsyncStream) -> None:
+    """
+    Read a completion stream up to [DONE] so httpx can reuse its connection.
+    
+    Trailing tokens after the JSON object are normally just the finish
+    event. If the model is still generating past the drain budget, the
+    connection is dropped instead.
+    """
+    async def read_to_end() -> bool:
+        for _ in range(STREAM_DRAIN_MAX_EVENTS):
+            try:
+                await stream.__anext__()
+            except StopAsyncIteration:
+                return True
+        return False
+    
+    try:
+        finished = await asyncio.wait_for(read_to_end(), STREAM_DRAIN_SECONDS)
+    except Exception:
+        finished = False
+    
+    if not finished:
+        await stream.response.aclose()
+
+
+class ZylinBrain:
+    """
+    Core LLM brain for Zylin.
+    Manages conversations, classifies intents, and extracts structured data.
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4-turbo-preview",
+        business_context: Optional[BusinessContext] = None
+    ):
+        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        self.model = model
+        self.business_context = business_context or DEFAULT_BUSINESS_CONTEXT
+        self._prompt_parts = _system_prompt_parts(self.business_context.model_dump_json())
+        
+        # (date, normalized question) -> response, oldest first
+        self._faq_cache: "OrderedDict[Tuple[date, str], ConversationResponse]" = OrderedDict()
+        
+        # Streams being drained after their JSON object closed
+        self._drain_tasks: Set[asyncio.Task] = set()
+    
+    @property
+    def system_prompt(self) -> str:
+        """System prompt with business context and today's date filled in."""
+        dates = _date_tokens(date.today())
+        return "".join(chain.from_iterable(zip(self._prompt_parts, dates + ("",))))
     
     async def process_message(
         self,
         user_message: str,
-        conversation_history: Optional[list[dict]] = None
+        conversation_history: Optional[list[dict]] = None,
+        on_message_delta: Optional[Callable[[str], None]] = None
     ) -> ConversationResponse:
         """
         Process a user message and return structured response.
@@ -181,10 +385,23 @@ Always respond naturally in the "message" field while providing structured data
         Args:
             user_message: The caller's message
             conversation_history: Previous messages in the conversation
+            on_message_delta: Called with pieces of the reply's "message" text
+                as the model streams them, so speech can start before the
+                whole object arrives. Cached and fallback replies are not
+                streamed; read their message from the returned response.
             
         Returns:
             ConversationResponse with intent, message, and extracted data
         """
+        # Opening FAQ questions repeat across callers; answers only change with the date
+        cache_key = None
+        if FAQ_CACHE_SIZE > 0 and not conversation_history:
+            cache_key = (date.today(), normalize_question(user_message))
+            cached = self._faq_cache.get(cache_key)
+            if cached is not None:
+                self._faq_cache.move_to_end(cache_key)
+                return cached.model_copy(deep=True)
+        
         messages = [{"role": "system", "content": self.system_prompt}]
         
         # Add conversation history
@@ -195,38 +412,70 @@ Always respond naturally in the "message" field while providing structured data
         messages.append({"role": "user", "content": user_message})
         
         try:
-            # Call OpenAI with JSON mode
-            response = await self.client.chat.completions.create(
+            # Call OpenAI with JSON mode, streaming so we can stop once the object closes
+            stream = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 response_format={"type": "json_object"},
                 temperature=0.4,
-                max_tokens=500
+                max_tokens=500,
+                stream=True
             )
             
-            # Parse JSON response
-            response_text = response.choices[0].message.content
-            response_data = json.loads(response_text)
-            
-            # Validate and structure response
-            return ConversationResponse(
-                intent=response_data.get("intent", "other"),
-                message=response_data.get("message", "I apologize, I didn't quite understand that. Could you please rephrase?"),
-                extracted_data=ExtractedData(**response_data.get("extracted_data", {})),
-                booking_complete=response_data.get("booking_complete", False),
-                needs_escalation=response_data.get("needs_escalation", False)
+            scanner = JsonObjectScanner(
+                stream_field="message" if on_message_delta else None,
+                on_field_text=on_message_delta
             )
+            parts = []
+            try:
+                async for chunk in stream:
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    
+                    delta = chunk.choices[0].delta.content
+                    end = scanner.feed(delta)
+                    if end is not None:
+                        parts.append(delta[:end])
+                        break
+                    parts.append(delta)
+            except BaseException:
+                await stream.response.aclose()
+                raise
             
+            # Finish reading the stream in the background so its keep-alive
+            # connection goes back to the pool instead of being dropped
+            self._release_stream(stream)
+            
+            # Parse and validate the JSON reply in one pass
+            response = ConversationResponse.model_validate_json("".join(parts))
+            
+            # Only plain FAQ answers are reusable (nothing caller-specific extracted)
+            if (
+                cache_key is not None
+                and response.intent == "faq"
+                and not response.needs_escalation
+                and not response.extracted_data.model_dump(exclude_none=True)
+            ):
+                self._faq_cache[cache_key] = response.model_copy(deep=True)
+                if len(self._faq_cache) > FAQ_CACHE_SIZE:
+                    self._faq_cache.popitem(last=False)
+            
+            return response
+            
+        except ValidationError as e:
+            # Malformed or off-schema reply from the model
+            print(f"Error processing message: invalid LLM reply: {e}")
+            return _fallback_response()
         except Exception as e:
             # Fallback response on error
             print(f"Error processing message: {e}")
-            return ConversationResponse(
-                intent="other",
-                message="I apologize, I'm having trouble processing that right now. Could you please try again?",
-                extracted_data=ExtractedData(),
-                booking_complete=False,
-                needs_escalation=False
-            )
+            return _fallback_response()
+    
+    def _release_stream(self, stream: AsyncStream) -> None:
+        """Drain a finished completion stream without delaying the reply."""
+        task = asyncio.create_task(_drain_stream(stream))
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
     
     async def get_conversation_summary(
         self,
@@ -251,3 +500,19 @@ Always respond naturally in the "message" field while providing structured data
         except Exception as e:
             print(f"Error generating summary: {e}")
             return "Conversation summary unavailable"
+
+
+# Process-wide default instance (shares one OpenAI client, FAQ cache and prompt cache)
+_default_brain: Optional[ZylinBrain] = None
+_default_brain_lock = threading.Lock()
+
+
+def get_default_brain() -> ZylinBrain:
+    """Get the shared ZylinBrain, creating it on first use."""
+    global _default_brain
+    
+    if _default_brain is None:
+        with _default_brain_lock:
+            if _default_brain is None:
+                _default_brain = ZylinBrain()
+    return _default_brain
@@ -14,6 +14,56 @@ from services.llm.brain import ZylinBrain, ConversationResponse
 from datetime import datetime
 
 
+# Output separators
+_SEP = "=" * 60
+_INTERACTIVE_BANNER = "🎯 " + "=" * 58
+_TEST_BANNER = "🧪 " + "=" * 58
+
+# (test_id, input_message, expected_intent, expected_data)
+AUTOMATED_TEST_CASES = [
+    # FAQ Tests
+    ("T1-FAQ-01", "What time are you open today?", "faq", None),
+    ("T1-FAQ-02", "Where is your clinic located?", "faq", None),
+    ("T1-FAQ-03", "Do you do blood tests?", "faq", None),
+    ("T1-FAQ-04", "How much does a consultation cost?", "faq", None),
+    
+    # Booking Tests
+    (
+        "T2-BOOK-01",
+        "I'd like to book an appointment for tomorrow at 3 PM. My name is Raj Kumar and my number is +919876543210.",
+        "booking",
+        {
+            "name": "Raj Kumar",
+            "phone": "+919876543210",
+            "time": "15:00"
+        }
+    ),
+    ("T2-BOOK-02", "I need an appointment.", "booking", None),
+    (
+        "T2-BOOK-08",
+        "Book me for the day after tomorrow at 4:30 PM. Name is Arjun, phone 9988776655.",
+        "booking",
+        {
+            "name": "Arjun",
+            "phone": "+919988776655",
+            "time": "16:30"
+        }
+    ),
+    
+    # Urgent Tests
+    ("T3-URG-01", "This is an emergency, I need help immediately!", "urgent", None),
+    (
+        "T3-URG-02",
+        "I'm very upset about the service I received yesterday. Your technician was rude and unprofessional.",
+        "urgent",
+        None
+    ),
+    
+    # Other Tests
+    ("T4-OTH-01", "Hi, I was just calling about stuff.", "other", None),
+]
+
+
 class TestHarness:
     """Interactive test harness for the LLM brain."""
     
@@ -21,57 +71,75 @@ class TestHarness:
         self.brain = ZylinBrain()
         self.conversation_history: list[dict] = []
         self.test_results: list[dict] = []
+        self._buf: list[str] = []
+    
+    def _emit(self, line: str = ""):
+        """Queue a line of output (written by _flush)."""
+        self._buf.append(line + "\n")
+    
+    def _flush(self):
+        """Write queued output in one call."""
+        sys.stdout.write("".join(self._buf))
+        sys.stdout.flush()
+        self._buf.clear()
     
     def display_response(self, response: ConversationResponse):
         """Display response in a formatted way."""
-        print("\n" + "="*60)
-        print(f"🤖 ZYLIN: {response.message}")
-        print(f"\n📊 Intent: {response.intent}")
+        self._emit(f"\n{_SEP}")
+        self._emit(f"🤖 ZYLIN: {response.message}")
+        self._emit(f"\n📊 Intent: {response.intent}")
         
-        if response.extracted_data.model_dump(exclude_none=True):
-            print(f"📝 Extracted Data:")
-            for key, value in response.extracted_data.model_dump(exclude_none=True).items():
-                print(f"   • {key}: {value}")
+        extracted = response.extracted_data.model_dump(exclude_none=True)
+        if extracted:
+            self._emit(f"📝 Extracted Data:")
+            for key, value in extracted.items():
+                self._emit(f"   • {key}: {value}")
         
         if response.booking_complete:
-            print("✅ Booking Complete!")
+            self._emit("✅ Booking Complete!")
         
         if response.needs_escalation:
-            print("🚨 Needs Escalation!")
+            self._emit("🚨 Needs Escalation!")
         
-        print("="*60 + "\n")
+        self._emit(f"{_SEP}\n")
+        self._flush()
     
     async def run_interactive(self):
         """Run interactive chat session."""
-        print("\n" + "🎯 " + "="*58)
-        print("   ZYLIN INTERACTIVE TEST HARNESS")
-        print("="*60)
-        print("Type your messages as a caller. Type 'quit' to exit.")
-        print("Type 'reset' to start a new conversation.")
-        print("Type 'history' to see conversation history.")
-        print("="*60 + "\n")
+        self._emit(f"\n{_INTERACTIVE_BANNER}")
+        self._emit("   ZYLIN INTERACTIVE TEST HARNESS")
+        self._emit(_SEP)
+        self._emit("Type your messages as a caller. Type 'quit' to exit.")
+        self._emit("Type 'reset' to start a new conversation.")
+        self._emit("Type 'history' to see conversation history.")
+        self._emit(f"{_SEP}\n")
+        self._flush()
         
         while True:
-            user_input = input("👤 YOU: ").strip()
+            # Read in a worker thread so the event loop keeps running between turns
+            user_input = (await asyncio.to_thread(input, "👤 YOU: ")).strip()
             
             if not user_input:
                 continue
             
             if user_input.lower() == 'quit':
-                print("\n👋 Goodbye!\n")
+                self._emit("\n👋 Goodbye!\n")
+                self._flush()
                 break
             
             if user_input.lower() == 'reset':
                 self.conversation_history = []
-                print("\n🔄 Conversation reset.\n")
+                self._emit("\n🔄 Conversation reset.\n")
+                self._flush()
                 continue
             
             if user_input.lower() == 'history':
-                print("\n📜 Conversation History:")
+                self._emit("\n📜 Conversation History:")
                 for msg in self.conversation_history:
                     role = "YOU" if msg["role"] == "user" else "ZYLIN"
-                    print(f"   {role}: {msg['content']}")
-                print()
+                    self._emit(f"   {role}: {msg['content']}")
+                self._emit()
+                self._flush()
                 continue
             
             # Process message
@@ -93,23 +161,20 @@ class TestHarness:
             # Display response
             self.display_response(response)
     
-    async def run_test_case(
+    async def evaluate_test_case(
         self,
         test_id: str,
         input_message: str,
         expected_intent: str,
         expected_data: dict = None,
         conversation_context: list[dict] = None
-    ) -> bool:
+    ) -> dict:
         """
-        Run a single test case.
+        Run a single test case without printing (safe to run concurrently).
         
         Returns:
-            True if test passes, False otherwise
+            Result dict (see print_test_result)
         """
-        print(f"\n🧪 Running Test: {test_id}")
-        print(f"   Input: {input_message}")
-        
         response = await self.brain.process_message(
             input_message,
             conversation_context or []
@@ -119,142 +184,109 @@ class TestHarness:
         intent_match = response.intent == expected_intent
         
         # Check extracted data if provided
-        data_match = True
+        mismatches = []
         if expected_data:
             extracted = response.extracted_data.model_dump(exclude_none=True)
             for key, expected_value in expected_data.items():
                 actual_value = extracted.get(key)
                 if actual_value != expected_value:
-                    data_match = False
-                    print(f"   ❌ Data mismatch - {key}: expected '{expected_value}', got '{actual_value}'")
+                    mismatches.append((key, expected_value, actual_value))
         
-        # Overall pass/fail
-        passed = intent_match and data_match
-        
-        if passed:
-            print(f"   ✅ PASSED")
-        else:
-            print(f"   ❌ FAILED")
-            if not intent_match:
-                print(f"      Expected intent: {expected_intent}, got: {response.intent}")
-        
-        print(f"   Response: {response.message}\n")
-        
-        self.test_results.append({
+        return {
             "test_id": test_id,
-            "passed": passed,
+            "input": input_message,
+            "passed": intent_match and not mismatches,
             "expected_intent": expected_intent,
             "actual_intent": response.intent,
+            "mismatches": mismatches,
             "response": response.message
-        })
-        
-        return passed
+        }
     
-    async def run_automated_tests(self):
-        """Run all automated test cases from test_llm_brain.md."""
-        print("\n" + "🧪 " + "="*58)
-        print("   RUNNING AUTOMATED TEST SUITE")
-        print("="*60 + "\n")
+    def print_test_result(self, result: dict):
+        """Display a test case result."""
+        self._emit(f"\n🧪 Running Test: {result['test_id']}")
+        self._emit(f"   Input: {result['input']}")
         
-        # FAQ Tests
-        await self.run_test_case(
-            "T1-FAQ-01",
-            "What time are you open today?",
-            "faq"
-        )
-        
-        await self.run_test_case(
-            "T1-FAQ-02",
-            "Where is your clinic located?",
-            "faq"
-        )
+        for key, expected_value, actual_value in result["mismatches"]:
+            self._emit(f"   ❌ Data mismatch - {key}: expected '{expected_value}', got '{actual_value}'")
         
-        await self.run_test_case(
-            "T1-FAQ-03",
-            "Do you do blood tests?",
-            "faq"
-        )
-        
-        await self.run_test_case(
-            "T1-FAQ-04",
-            "How much does a consultation cost?",
-            "faq"
-        )
-        
-        # Booking Tests
-        await self.run_test_case(
-            "T2-BOOK-01",
-            "I'd like to book an appointment for tomorrow at 3 PM. My name is Raj Kumar and my number is +919876543210.",
-            "booking",
-            {
-                "name": "Raj Kumar",
-                "phone": "+919876543210",
-                "time": "15:00"
-            }
-        )
-        
-        await self.run_test_case(
-            "T2-BOOK-02",
-            "I need an appointment.",
-            "booking"
-        )
+        if result["passed"]:
+            self._emit(f"   ✅ PASSED")
+        else:
+            self._emit(f"   ❌ FAILED")
+            if result["actual_intent"] != result["expected_intent"]:
+                self._emit(f"      Expected intent: {result['expected_intent']}, got: {result['actual_intent']}")
         
-        await self.run_test_case(
-            "T2-BOOK-08",
-            "Book me for the day after tomorrow at 4:30 PM. Name is Arjun, phone 9988776655.",
-            "booking",
-            {
-                "name": "Arjun",
-                "phone": "+919988776655",
-                "time": "16:30"
-            }
-        )
+        self._emit(f"   Response: {result['response']}\n")
+        self._flush()
+    
+    async def run_test_case(
+        self,
+        test_id: str,
+        input_message: str,
+        expected_intent: str,
+        expected_data: dict = None,
+        conversation_context: list[dict] = None
+    ) -> bool:
+        """
+        Run a single test case.
         
-        # Urgent Tests
-        await self.run_test_case(
-            "T3-URG-01",
-            "This is an emergency, I need help immediately!",
-            "urgent"
+        Returns:
+            True if test passes, False otherwise
+        """
+        result = await self.evaluate_test_case(
+            test_id,
+            input_message,
+            expected_intent,
+            expected_data,
+            conversation_context
         )
+        self.print_test_result(result)
+        self.test_results.append(result)
         
-        await self.run_test_case(
-            "T3-URG-02",
-            "I'm very upset about the service I received yesterday. Your technician was rude and unprofessional.",
-            "urgent"
-        )
+        return result["passed"]
+    
+    async def run_automated_tests(self):
+        """Run all automated test cases from test_llm_brain.md."""
+        self._emit(f"\n{_TEST_BANNER}")
+        self._emit("   RUNNING AUTOMATED TEST SUITE")
+        self._emit(f"{_SEP}\n")
         
-        # Other Tests
-        await self.run_test_case(
-            "T4-OTH-01",
-            "Hi, I was just calling about stuff.",
-            "other"
+        # Cases are independent API calls: run them together, report in order
+        results = await asyncio.gather(
+            *(self.evaluate_test_case(*case) for case in AUTOMATED_TEST_CASES)
         )
+        for result in results:
+            self.print_test_result(result)
+            self.test_results.append(result)
         
         # Print summary
-        print("\n" + "="*60)
-        print("📊 TEST SUMMARY")
-        print("="*60)
+        self._emit(f"\n{_SEP}")
+        self._emit("📊 TEST SUMMARY")
+        self._emit(_SEP)
         
+        # One pass over the results for both the counts and the failure list
         total = len(self.test_results)
-        passed = sum(1 for r in self.test_results if r["passed"])
+        failed = [r for r in self.test_results if not r["passed"]]
+        passed = total - len(failed)
         accuracy = (passed / total * 100) if total > 0 else 0
         
-        print(f"\nTotal Tests: {total}")
-        print(f"Passed: {passed}")
-        print(f"Failed: {total - passed}")
-        print(f"Accuracy: {accuracy:.1f}%\n")
+        self._emit(f"\nTotal Tests: {total}")
+        self._emit(f"Passed: {passed}")
+        self._emit(f"Failed: {len(failed)}")
+        self._emit(f"Accuracy: {accuracy:.1f}%\n")
         
         if accuracy >= 90:
-            print("✅ SUCCESS: Brain passes acceptance criteria (≥90%)")
+            self._emit("✅ SUCCESS: Brain passes acceptance criteria (≥90%)")
         else:
-            print("❌ FAILURE: Brain needs improvement")
+            self._emit("❌ FAILURE: Brain needs improvement")
         
-        print("\nFailed Tests:")
-        for result in self.test_results:
-            if not result["passed"]:
-                print(f"  • {result['test_id']}: Expected {result['expected_intent']}, got {result['actual_intent']}")
+        self._emit("\nFailed Tests:")
+        for result in failed:
+            self._emit(f"  • {result['test_id']}: Expected {result['expected_intent']}, got {result['actual_intent']}")
         
-        print("="*60 + "\n")
+        self._emit(f"{_SEP}\n")
+        self._flush()
 
 
 async def main():
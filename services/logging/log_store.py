@@ -3,12 +3,112 @@ Call Logging Service
 Stores conversation logs and metadata for analytics.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union
 from pydantic import BaseModel
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import sqlite3
+import threading
+import time
+import math
+import os
+import zlib
 from pathlib import Path
-import json
+import orjson
+
+# Compact binary transcripts (optional, TRANSCRIPT_FORMAT=msgpack)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# How new transcripts are written: "json" (TEXT) or "msgpack" (BLOB). Reads
+# accept both, so the flag can be switched without migrating existing rows.
+TRANSCRIPT_FORMAT = os.getenv("TRANSCRIPT_FORMAT", "json").lower()
+
+# Transcript compression (optional, TRANSCRIPT_COMPRESSION=zstd)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# "none", "zstd" (level 3) or "zlib" (stdlib). Compressed transcripts are
+# stored as BLOBs; reads detect the codec from the frame header.
+TRANSCRIPT_COMPRESSION = os.getenv("TRANSCRIPT_COMPRESSION", "none").lower()
+ZSTD_LEVEL = 3
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZLIB_HEADER = 0x78
+
+# Applied once when the connection is opened: WAL keeps dashboard reads from
+# blocking on call-log inserts and synchronous=NORMAL drops the per-commit fsync
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+# Shared by create_log and create_logs so both hit the same prepared statement
+_INSERT_LOG_SQL = (
+    "INSERT INTO call_logs (session_id, caller_phone, start_time, end_time, "
+    "duration_seconds, intent, transcript, summary, "
+    "booking_created, booking_id, escalated, status) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Reads name their columns so rows come back as plain tuples in this order
+_CALL_LOG_COLUMNS = (
+    "log_id", "session_id", "caller_phone", "start_time", "end_time",
+    "duration_seconds", "intent", "transcript", "summary",
+    "booking_created", "booking_id", "escalated", "status",
+)
+_SELECT_LOGS_SQL = f"SELECT {', '.join(_CALL_LOG_COLUMNS)} FROM call_logs"
+
+# Listing reads leave the (large) transcript behind; NULL keeps the column order
+_SELECT_LOG_SUMMARIES_SQL = "SELECT " + ", ".join(
+    "NULL" if column == "transcript" else column for column in _CALL_LOG_COLUMNS
+) + " FROM call_logs"
+
+# Fixed statement texts: each is compiled once and then served from the
+# connection's statement cache on every later call
+_GET_LOG_SQL = _SELECT_LOGS_SQL + " WHERE session_id = ?"
+
+_GET_TRANSCRIPT_SQL = "SELECT transcript FROM call_logs WHERE session_id = ?"
+
+_DAILY_STATS_SQL = """
+    SELECT
+        COUNT(*) as total_calls,
+        SUM(CASE WHEN intent = 'faq' THEN 1 ELSE 0 END) as faq_count,
+        SUM(CASE WHEN intent = 'booking' THEN 1 ELSE 0 END) as booking_count,
+        SUM(CASE WHEN intent = 'urgent' THEN 1 ELSE 0 END) as urgent_count,
+        SUM(CASE WHEN booking_created = 1 THEN 1 ELSE 0 END) as bookings_created,
+        SUM(CASE WHEN escalated = 1 THEN 1 ELSE 0 END) as escalations,
+        AVG(duration_seconds) as avg_duration
+    FROM call_logs
+    WHERE start_time >= ? AND start_time < ?
+"""
+
+_RECENT_LOGS_SQL = _SELECT_LOG_SUMMARIES_SQL + """
+    WHERE start_time >= ? AND start_time < ?
+    ORDER BY start_time DESC
+    LIMIT ?
+"""
+
+CALL_LOG_INDEXES = (
+    "idx_calllogs_start_intent",
+    "idx_calllogs_escalated",
+    "idx_calllogs_booking_created",
+)
+
+# Today's stats can still change, so they are only reused this long; past
+# days are cached until a log for that day is inserted, or until another
+# connection (another worker, scripts/daily_report.py) writes to the database
+DAILY_STATS_TTL_SECONDS = 60.0
+
+# Room for every fixed statement plus all list_logs filter combinations
+SQLITE_CACHED_STATEMENTS = 256
 
 
 class CallLog(BaseModel):
@@ -20,12 +120,31 @@ class CallLog(BaseModel):
     end_time: Optional[str] = None
     duration_seconds: Optional[int] = None
     intent: Optional[str] = None
-    transcript: Optional[str] = None  # Full conversation as JSON
+    transcript: Optional[Union[str, bytes]] = None  # Full conversation (see encode_transcript)
     summary: Optional[str] = None
     booking_created: bool = False
     booking_id: Optional[int] = None
     escalated: bool = False
     status: str = "completed"  # completed, failed, abandoned
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> "CallLog":
+        """Build a CallLog from a stored row without re-validating it (validated on insert)."""
+        return cls.model_construct(
+            log_id=row[0],
+            session_id=row[1],
+            caller_phone=row[2],
+            start_time=row[3],
+            end_time=row[4],
+            duration_seconds=row[5],
+            intent=row[6],
+            transcript=row[7],
+            summary=row[8],
+            booking_created=bool(row[9]),
+            booking_id=row[10],
+            escalated=bool(row[11]),
+            status=row[12]
+        )
 
 
 class CallLogStore:
@@ -40,91 +159,185 @@ class CallLogStore:
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
+        # One long-lived connection keeps SQLite's page and statement caches warm
+        # across calls; the lock serializes threads (create_log runs via to_thread)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=SQLITE_CACHED_STATEMENTS
+        )
+        for pragma in SQLITE_PRAGMAS:
+            self._conn.execute(pragma)
+        
+        # date_str -> (expires_at monotonic, stats dict), guarded by self._lock;
+        # dropped whenever PRAGMA data_version shows another connection's commit
+        self._stats_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._stats_data_version: Optional[int] = None
+        
         # Initialize database
         self._init_db()
     
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
     def _init_db(self):
         """Create call_logs table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock:
+            # log_id is the rowid itself (no AUTOINCREMENT), so an insert doesn't
+            # also have to update sqlite_sequence. WITHOUT ROWID isn't used: rows
+            # carry whole transcripts, and SQLite only recommends it for small rows
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS call_logs (
-                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    log_id INTEGER PRIMARY KEY,
                     session_id TEXT NOT NULL UNIQUE,
                     caller_phone TEXT,
                     start_time TEXT NOT NULL,
                     end_time TEXT,
                     duration_seconds INTEGER,
                     intent TEXT,
-                    transcript TEXT,
+                    transcript BLOB,
                     summary TEXT,
-                    booking_created INTEGER DEFAULT 0,
+                    booking_created INTEGER DEFAULT 0 CHECK (booking_created IN (0, 1)),
                     booking_id INTEGER,
-                    escalated INTEGER DEFAULT 0,
+                    escalated INTEGER DEFAULT 0 CHECK (escalated IN (0, 1)),
                     status TEXT DEFAULT 'completed'
                 )
             """)
-            conn.commit()
+            
+            # list_logs and the daily queries range-scan start_time, optionally by intent
+            existing = {
+                row[0] for row in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'call_logs'"
+                )
+            }
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_calllogs_start_intent
+                ON call_logs(start_time DESC, intent)
+            """)
+            
+            # Partial indexes hold only the few flagged rows, so escalation and
+            # booking lookups read k entries instead of the whole date range
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_calllogs_escalated
+                ON call_logs(start_time DESC) WHERE escalated = 1
+            """)
+            self._conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_calllogs_booking_created
+                ON call_logs(start_time DESC) WHERE booking_created = 1
+            """)
+            
+            # Gather planner statistics once, when the indexes are first built
+            if not set(CALL_LOG_INDEXES) <= existing:
+                self._conn.execute("ANALYZE call_logs")
     
     def create_log(self, log: CallLog) -> CallLog:
         """Create a new call log."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                INSERT INTO call_logs (
-                    session_id, caller_phone, start_time, end_time,
-                    duration_seconds, intent, transcript, summary,
-                    booking_created, booking_id, escalated, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                log.session_id,
-                log.caller_phone,
-                log.start_time,
-                log.end_time,
-                log.duration_seconds,
-                log.intent,
-                log.transcript,
-                log.summary,
-                1 if log.booking_created else 0,
-                log.booking_id,
-                1 if log.escalated else 0,
-                log.status
-            ))
-            conn.commit()
+        with self._lock:
+            cursor = self._conn.execute(_INSERT_LOG_SQL, _log_params(log))
             log.log_id = cursor.lastrowid
+            self._stats_cache.pop(log.start_time[:10], None)
         
         return log
     
+    def create_logs(self, logs: List[CallLog]) -> List[CallLog]:
+        """
+        Create many call logs in a single transaction.
+        
+        Args:
+            logs: Call logs to insert (log_ids will be auto-assigned)
+            
+        Returns:
+            The same logs with log_id filled in
+        """
+        if not logs:
+            return logs
+        
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_INSERT_LOG_SQL, (_log_params(log) for log in logs))
+                
+                # Rowids assigned inside one write transaction are consecutive
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                first_id = last_id - len(logs) + 1
+                for offset, log in enumerate(logs):
+                    log.log_id = first_id + offset
+                self._conn.execute("COMMIT")
+                for log in logs:
+                    self._stats_cache.pop(log.start_time[:10], None)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                for log in logs:
+                    log.log_id = None
+                raise
+        
+        return logs
+    
     def get_log(self, session_id: str) -> Optional[CallLog]:
         """Get log by session ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                "SELECT * FROM call_logs WHERE session_id = ?",
-                (session_id,)
-            )
+        with self._lock:
+            cursor = self._conn.execute(_GET_LOG_SQL, (session_id,))
             row = cursor.fetchone()
             
             if row:
-                return CallLog(**dict(row))
+                return CallLog.from_row(row)
+            return None
+    
+    def get_transcript(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read and decode only the transcript of one call.
+        
+        Args:
+            session_id: Session ID of the call
+            
+        Returns:
+            Conversation messages, or None if no such call was logged
+        """
+        with self._lock:
+            row = self._conn.execute(_GET_TRANSCRIPT_SQL, (session_id,)).fetchone()
+        
+        if row is None:
             return None
+        return decode_transcript(row[0])
     
     def list_logs(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         intent: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        escalated_only: bool = False,
+        booking_created_only: bool = False,
+        include_transcript: bool = False
     ) -> List[CallLog]:
-        """List call logs with optional filters."""
-        query = "SELECT * FROM call_logs WHERE 1=1"
+        """
+        List call logs with optional filters.
+        
+        Transcripts are left out (transcript=None) unless include_transcript is
+        set; use get_transcript to read one call's conversation.
+        """
+        query = (_SELECT_LOGS_SQL if include_transcript else _SELECT_LOG_SUMMARIES_SQL) + " WHERE 1=1"
         params = []
         
+        # Literal predicates (not bound params) so SQLite can match the partial indexes
+        if escalated_only:
+            query += " AND escalated = 1"
+        
+        if booking_created_only:
+            query += " AND booking_created = 1"
+        
         if start_date:
             query += " AND start_time >= ?"
             params.append(start_date)
         
         if end_date:
-            query += " AND start_time <= ?"
-            params.append(f"{end_date} 23:59:59")
+            # Half-open bound so ISO "T" timestamps on end_date are included
+            query += " AND start_time < ?"
+            params.append(_next_day(end_date))
         
         if intent:
             query += " AND intent = ?"
@@ -133,44 +346,208 @@ class CallLogStore:
         query += " ORDER BY start_time DESC LIMIT ?"
         params.append(limit)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
+        with self._lock:
+            cursor = self._conn.execute(query, params)
             rows = cursor.fetchall()
             
-            return [CallLog(**dict(row)) for row in rows]
+            return [CallLog.from_row(row) for row in rows]
     
     def get_daily_stats(self, date_str: Optional[str] = None) -> Dict[str, Any]:
         """Get statistics for a specific date."""
         if not date_str:
             date_str = date.today().isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT
-                    COUNT(*) as total_calls,
-                    SUM(CASE WHEN intent = 'faq' THEN 1 ELSE 0 END) as faq_count,
-                    SUM(CASE WHEN intent = 'booking' THEN 1 ELSE 0 END) as booking_count,
-                    SUM(CASE WHEN intent = 'urgent' THEN 1 ELSE 0 END) as urgent_count,
-                    SUM(CASE WHEN booking_created = 1 THEN 1 ELSE 0 END) as bookings_created,
-                    SUM(CASE WHEN escalated = 1 THEN 1 ELSE 0 END) as escalations,
-                    AVG(duration_seconds) as avg_duration
-                FROM call_logs
-                WHERE DATE(start_time) = ?
-            """, (date_str,))
-            
-            row = cursor.fetchone()
+        with self._lock:
+            return dict(self._cached_daily_stats(date_str))
+    
+    def get_daily_report(
+        self,
+        date_str: Optional[str] = None,
+        recent_n: int = 10
+    ) -> Tuple[Dict[str, Any], List[CallLog]]:
+        """
+        Get daily statistics and the most recent calls in one database round.
+        
+        Args:
+            date_str: Date in YYYY-MM-DD format (defaults to today)
+            recent_n: Number of most recent calls to return
             
-            return {
-                "date": date_str,
-                "total_calls": row[0] or 0,
-                "faq_count": row[1] or 0,
-                "booking_count": row[2] or 0,
-                "urgent_count": row[3] or 0,
-                "bookings_created": row[4] or 0,
-                "escalations": row[5] or 0,
-                "avg_duration_seconds": round(row[6], 1) if row[6] else 0
-            }
+        Returns:
+            Tuple of (stats dict as from get_daily_stats, recent CallLogs newest
+            first, without transcripts)
+        """
+        if not date_str:
+            date_str = date.today().isoformat()
+        
+        with self._lock:
+            stats = dict(self._cached_daily_stats(date_str))
+            rows = self._conn.execute(
+                _RECENT_LOGS_SQL,
+                (*_day_range(date_str), recent_n)
+            ).fetchall()
+        
+        return stats, [CallLog.from_row(row) for row in rows]
+    
+    def _cached_daily_stats(self, date_str: str) -> Dict[str, Any]:
+        """Return the day's stats from the cache, querying on a miss (hold self._lock)."""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._stats_data_version:
+            self._stats_cache.clear()
+            self._stats_data_version = data_version
+        
+        now = time.monotonic()
+        entry = self._stats_cache.get(date_str)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        
+        stats = self._query_daily_stats(self._conn, date_str)
+        
+        # Past days only change if a late log lands: create_log invalidates the
+        # day for this connection, data_version covers every other writer
+        is_past = date_str < date.today().isoformat()
+        expires_at = math.inf if is_past else now + DAILY_STATS_TTL_SECONDS
+        self._stats_cache[date_str] = (expires_at, stats)
+        return stats
+    
+    def _query_daily_stats(self, conn: sqlite3.Connection, date_str: str) -> Dict[str, Any]:
+        """Run the daily aggregate query on an open connection."""
+        cursor = conn.execute(_DAILY_STATS_SQL, _day_range(date_str))
+        
+        row = cursor.fetchone()
+        
+        return {
+            "date": date_str,
+            "total_calls": row[0] or 0,
+            "faq_count": row[1] or 0,
+            "booking_count": row[2] or 0,
+            "urgent_count": row[3] or 0,
+            "bookings_created": row[4] or 0,
+            "escalations": row[5] or 0,
+            "avg_duration_seconds": round(row[6], 1) if row[6] else 0
+        }
+
+
+def _log_params(log: CallLog) -> tuple:
+    """Bind parameters for _INSERT_LOG_SQL (bools bind as 0/1, being ints)."""
+    return (
+        log.session_id,
+        log.caller_phone,
+        log.start_time,
+        log.end_time,
+        log.duration_seconds,
+        log.intent,
+        log.transcript,
+        log.summary,
+        log.booking_created,
+        log.booking_id,
+        log.escalated,
+        log.status
+    )
+
+
+def _next_day(date_str: str) -> str:
+    """Return the ISO date after date_str (exclusive upper bound for a day's start_time)."""
+    return (date.fromisoformat(date_str) + timedelta(days=1)).isoformat()
+
+
+def _day_range(date_str: str) -> Tuple[str, str]:
+    """
+    Half-open [start, end) bounds covering every start_time on date_str.
+    
+    Comparing the bare column against these keeps the predicate sargable,
+    unlike DATE(start_time) = ?, so SQLite seeks idx_calllogs_start_intent.
+    """
+    day = date.fromisoformat(date_str)
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Encode values msgpack has no type for (timestamps) the way orjson does."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} in a transcript")
+
+
+def encode_transcript(
+    conversation: List[Dict[str, Any]],
+    fmt: Optional[str] = None,
+    compression: Optional[str] = None
+) -> Union[str, bytes]:
+    """
+    Serialize a conversation for the transcript column.
+    
+    Args:
+        conversation: Messages as {role, content, ...} dicts
+        fmt: "json" or "msgpack" (defaults to TRANSCRIPT_FORMAT)
+        compression: "none", "zstd" or "zlib" (defaults to TRANSCRIPT_COMPRESSION)
+        
+    Returns:
+        JSON text, or bytes (msgpack and/or compressed)
+    """
+    fmt = fmt or TRANSCRIPT_FORMAT
+    compression = compression or TRANSCRIPT_COMPRESSION
+    
+    if fmt == "json":
+        encoded = orjson.dumps(conversation)
+    elif fmt == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise ImportError(
+                "msgpack not available. Install with: pip install msgpack"
+            )
+        encoded = msgpack.packb(conversation, default=_msgpack_default)
+    else:
+        raise ValueError(f"Unknown transcript format: {fmt}")
+    
+    if compression == "none":
+        return encoded.decode() if fmt == "json" else encoded
+    
+    if compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "zstandard not available. Install with: pip install zstandard"
+            )
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(encoded)
+    
+    if compression == "zlib":
+        return zlib.compress(encoded)
+    
+    raise ValueError(f"Unknown transcript compression: {compression}")
+
+
+def decode_transcript(transcript: Optional[Union[str, bytes]]) -> List[Dict[str, Any]]:
+    """
+    Parse a stored transcript written in either format.
+    
+    Args:
+        transcript: Value of the transcript column (JSON text or bytes)
+        
+    Returns:
+        Conversation messages (empty if no transcript was stored)
+    """
+    if not transcript:
+        return []
+    
+    if isinstance(transcript, str):
+        return orjson.loads(transcript)
+    
+    # Neither header can start a msgpack array or JSON text
+    if transcript[:4] == _ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "zstandard not available. Install with: pip install zstandard"
+            )
+        transcript = zstandard.ZstdDecompressor().decompress(transcript)
+    elif transcript[0] == _ZLIB_HEADER:
+        transcript = zlib.decompress(transcript)
+    
+    if transcript[:1] == b"[":
+        return orjson.loads(transcript)
+    
+    if not MSGPACK_AVAILABLE:
+        raise ImportError(
+            "msgpack not available. Install with: pip install msgpack"
+        )
+    return msgpack.unpackb(transcript)
 
 
 # Helper to create log from session
@@ -182,21 +559,24 @@ def create_log_from_session(
     """Create CallLog from conversation session data."""
     start_time = session.get("start_time")
     
+    # One clock read for the end of the call (local time, like start_time)
+    now = datetime.now()
+    now_iso = now.isoformat()
+    
     # Calculate duration if possible
     duration = None
     if start_time:
         start_dt = datetime.fromisoformat(start_time)
-        end_dt = datetime.now()
-        duration = int((end_dt - start_dt).total_seconds())
+        duration = int((now - start_dt).total_seconds())
     
     return CallLog(
         session_id=session["session_id"],
         caller_phone=session.get("caller_phone"),
-        start_time=start_time or datetime.now().isoformat(),
-        end_time=datetime.now().isoformat(),
+        start_time=start_time or now_iso,
+        end_time=now_iso,
         duration_seconds=duration,
         intent=session.get("intent"),
-        transcript=json.dumps(session.get("conversation", [])),
+        transcript=encode_transcript(session.get("conversation", [])),
         summary=summary,
         booking_created=booking_id is not None,
         booking_id=booking_id,
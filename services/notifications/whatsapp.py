@@ -6,9 +6,20 @@ Sends notifications via Twilio WhatsApp API.
 from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
+import logging
 import os
 from twilio.rest import Client
 
+logger = logging.getLogger(__name__)
+
+WHATSAPP_PREFIX = "whatsapp:"
+
+
+def whatsapp_address(phone: str) -> str:
+    """Return phone as a Twilio WhatsApp address (adds the prefix if missing)."""
+    return phone if phone.startswith(WHATSAPP_PREFIX) else WHATSAPP_PREFIX + phone
+
 
 class WhatsAppMessage(BaseModel):
     """WhatsApp message to send."""
@@ -48,10 +59,7 @@ class WhatsAppService:
             
             # Format WhatsApp number
             from_num = from_number or os.getenv("TWILIO_WHATSAPP_NUMBER")
-            if from_num and not from_num.startswith("whatsapp:"):
-                from_num = f"whatsapp:{from_num}"
-            
-            self.from_number = from_num
+            self.from_number = whatsapp_address(from_num) if from_num else from_num
         else:
             self.client = None
             self.from_number = "whatsapp:+1234567890"
@@ -72,18 +80,14 @@ class WhatsAppService:
             Result dict with status and details
         """
         # Format recipient number
-        if not to_phone.startswith("whatsapp:"):
-            to_phone = f"whatsapp:{to_phone}"
+        to_phone = whatsapp_address(to_phone)
         
         if self.dry_run:
             # Log only in dry-run mode
-            print(f"\n{'='*60}")
-            print(f"📱 [DRY RUN] WhatsApp Message")
-            print(f"{'='*60}")
-            print(f"From: {self.from_number}")
-            print(f"To: {to_phone}")
-            print(f"Message:\n{message}")
-            print(f"{'='*60}\n")
+            logger.info(
+                "📱 [DRY RUN] WhatsApp message\nFrom: %s\nTo: %s\nMessage:\n%s",
+                self.from_number, to_phone, message
+            )
             
             return {
                 "status": "dry_run",
@@ -100,7 +104,7 @@ class WhatsAppService:
                 body=message
             )
             
-            print(f"✅ WhatsApp sent to {to_phone}: SID={result.sid}")
+            logger.info("✅ WhatsApp sent to %s: SID=%s", to_phone, result.sid)
             
             return {
                 "status": "sent",
@@ -110,7 +114,7 @@ class WhatsAppService:
             }
             
         except Exception as e:
-            print(f"❌ Failed to send WhatsApp to {to_phone}: {e}")
+            logger.error("❌ Failed to send WhatsApp to %s: %s", to_phone, e)
             
             return {
                 "status": "failed",
@@ -119,6 +123,25 @@ class WhatsAppService:
                 "timestamp": datetime.now().isoformat()
             }
     
+    async def send_message_async(
+        self,
+        to_phone: str,
+        message: str
+    ) -> dict:
+        """
+        Send WhatsApp message without blocking the event loop.
+        
+        The Twilio client is synchronous, so the send runs in a worker thread.
+        
+        Args:
+            to_phone: Recipient phone (format: +919876543210)
+            message: Message text
+            
+        Returns:
+            Result dict as from send_message
+        """
+        return await asyncio.to_thread(self.send_message, to_phone, message)
+    
     def send_booking_confirmation(
         self,
         customer_name: str,
@@ -0,0 +1,104 @@
+"""
+Call Session Store
+Maps Twilio CallSids to conversation state so webhook callbacks can find
+their session from any worker process.
+"""
+
+from typing import Optional, Any, Dict, Tuple
+import json
+import os
+import time
+
+# Redis support (required for multi-worker deployments)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class CallSessionStore:
+    """
+    CallSid → session mapping with a TTL.
+
+    Uses Redis when REDIS_URL is configured so every uvicorn worker sees the
+    same mapping. Falls back to an in-process dict for single-worker setups.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 3600,
+        key_prefix: str = "twilio:session:"
+    ):
+        """
+        Initialize call session store.
+
+        Args:
+            redis_url: Redis connection URL (defaults to REDIS_URL env var)
+            ttl_seconds: How long a mapping lives before it expires
+            key_prefix: Prefix for Redis keys
+        """
+        self.redis_url = redis_url or os.getenv("REDIS_URL")
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+        self._redis = None
+        self._closed = False
+        self._local: Dict[str, Tuple[float, str]] = {}  # call_sid -> (expires_at, value)
+
+        if self.redis_url:
+            if not REDIS_AVAILABLE:
+                raise ImportError(
+                    "Redis client not available. Install with: pip install redis"
+                )
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+
+    async def set(self, call_sid: str, value: Any) -> None:
+        """Store a JSON-serializable value for a call."""
+        payload = json.dumps(value)
+
+        if self._redis is not None:
+            await self._redis.set(self.key_prefix + call_sid, payload, ex=self.ttl_seconds)
+            return
+
+        self._evict_expired()
+        self._local.pop(call_sid, None)  # Re-insert so dict order tracks expiry
+        self._local[call_sid] = (time.monotonic() + self.ttl_seconds, payload)
+
+    async def get(self, call_sid: str) -> Optional[Any]:
+        """Get the value stored for a call, or None if missing/expired."""
+        if self._redis is not None:
+            payload = await self._redis.get(self.key_prefix + call_sid)
+        else:
+            entry = self._local.get(call_sid)
+            payload = None
+            if entry:
+                expires_at, payload = entry
+                if expires_at <= time.monotonic():
+                    del self._local[call_sid]
+                    payload = None
+
+        return json.loads(payload) if payload is not None else None
+
+    async def delete(self, call_sid: str) -> None:
+        """Remove the mapping for a call."""
+        if self._redis is not None:
+            await self._redis.delete(self.key_prefix + call_sid)
+        else:
+            self._local.pop(call_sid, None)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool (no-op for in-process store; safe to call twice)."""
+        if self._redis is not None and not self._closed:
+            self._closed = True
+            await self._redis.aclose()
+
+    def _evict_expired(self) -> None:
+        """Drop expired local entries (oldest first, all share the same TTL)."""
+        now = time.monotonic()
+        while self._local:
+            call_sid, (expires_at, _) = next(iter(self._local.items()))
+            if expires_at > now:
+                break
+            del self._local[call_sid]
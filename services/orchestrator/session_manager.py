@@ -3,15 +3,25 @@ Conversation Orchestrator
 Manages end-to-end conversation flow: ASR → LLM → TTS
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
+from collections import OrderedDict
 from pathlib import Path
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
-import uuid
+import asyncio
+import logging
+import time
 
-from services.asr.transcribe import ASRService
-from services.llm.brain import ZylinBrain, ConversationResponse
+from services.asr.transcribe import ASRService, TranscriptionResult, get_default_asr
+from services.llm.brain import ZylinBrain, ConversationResponse, get_default_brain
 from services.tts.synthesize import TTSService, Voice
+from services.utils.ids import new_session_id
+
+logger = logging.getLogger(__name__)
+
+# Most messages sent to the LLM per turn (32 turns). The full history is kept
+# for the call log; only the LLM context is bounded.
+MAX_LLM_CONTEXT_MESSAGES = 64
 
 
 class ConversationSession(BaseModel):
@@ -19,10 +29,29 @@ class ConversationSession(BaseModel):
     session_id: str
     caller_phone: Optional[str] = None
     start_time: datetime
-    conversation_history: List[Dict[str, str]] = []
+    conversation_history: List[Dict[str, str]] = Field(default_factory=list)
     intent: Optional[str] = None
     booking_data: Dict[str, Any] = {}
     completed: bool = False
+    turn_count: int = 0
+    
+    # LLM context, append-only between trims so each request repeats the
+    # previous one's prefix (OpenAI prompt-cache hits). Once it reaches
+    # MAX_LLM_CONTEXT_MESSAGES it restarts from the latest half.
+    _llm_view: List[Dict[str, str]] = PrivateAttr(default_factory=list)
+    
+    def add_message(self, role: str, content: str) -> None:
+        """Record a message in the full history and the LLM context."""
+        message = {"role": role, "content": content}
+        self.conversation_history.append(message)
+        
+        if len(self._llm_view) >= MAX_LLM_CONTEXT_MESSAGES:
+            self._llm_view = self._llm_view[-(MAX_LLM_CONTEXT_MESSAGES // 2):]
+        self._llm_view.append(message)
+    
+    def get_conversation_for_llm(self) -> List[Dict[str, str]]:
+        """Get the bounded history sent to the LLM (shared list, don't mutate)."""
+        return self._llm_view
 
 
 class OrchestratorResult(BaseModel):
@@ -35,6 +64,7 @@ class OrchestratorResult(BaseModel):
     booking_complete: bool
     needs_escalation: bool
     extracted_data: Dict[str, Any]
+    streamed: bool = False  # bot_text was delivered through on_message_delta
 
 
 class ConversationOrchestrator:
@@ -51,53 +81,103 @@ class ConversationOrchestrator:
         brain: Optional[ZylinBrain] = None,
         tts_service: Optional[TTSService] = None,
         default_voice: Voice = "nova",
-        generate_audio: bool = True
+        generate_audio: bool = True,
+        max_sessions: int = 10_000,
+        session_ttl_seconds: float = 3600
     ):
         """
         Initialize orchestrator.
         
         Args:
             asr_service: ASR service instance
-            brain: LLM brain instance
+            brain: LLM brain instance (defaults to the shared one)
             tts_service: TTS service instance
             default_voice: Default TTS voice
             generate_audio: Whether to generate TTS audio (disable for testing)
+            max_sessions: Most sessions kept in memory (least recently used evicted first)
+            session_ttl_seconds: How long an idle session is kept
         """
-        self.asr = asr_service or ASRService()
-        self.brain = brain or ZylinBrain()
+        self.asr = asr_service or get_default_asr()
+        self.brain = brain or get_default_brain()
         self.tts = tts_service or TTSService(voice=default_voice)
         self.generate_audio = generate_audio
         
-        # Active sessions
-        self.sessions: Dict[str, ConversationSession] = {}
+        # Active sessions, least recently used first so eviction only looks at the front
+        self.max_sessions = max_sessions
+        self.session_ttl_seconds = session_ttl_seconds
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._expires_at: Dict[str, float] = {}
+        self.evicted_sessions = 0
     
     def create_session(
         self,
-        caller_phone: Optional[str] = None
+        caller_phone: Optional[str] = None,
+        session_id: Optional[str] = None,
+        start_time: Optional[datetime] = None
     ) -> ConversationSession:
-        """Create a new conversation session."""
-        session_id = str(uuid.uuid4())
+        """
+        Create a new conversation session.
+        
+        Args:
+            caller_phone: Caller's phone number
+            session_id: Reuse an existing ID (e.g. rebuilding a session that
+                was started on another worker); a new one is generated if None
+            start_time: When the call started (defaults to now)
+            
+        Returns:
+            The new session
+        """
+        session_id = session_id or new_session_id()
         
         session = ConversationSession(
             session_id=session_id,
             caller_phone=caller_phone,
-            start_time=datetime.now(),
-            conversation_history=[],
+            start_time=start_time or datetime.now(),
             booking_data={}
         )
         
+        self._evict_sessions()
         self.sessions[session_id] = session
+        self._expires_at[session_id] = time.monotonic() + self.session_ttl_seconds
         return session
     
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
-        """Get an existing session."""
-        return self.sessions.get(session_id)
+        """Get an existing session, marking it as recently used."""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.move_to_end(session_id)
+            self._expires_at[session_id] = time.monotonic() + self.session_ttl_seconds
+        return session
+    
+    def end_session(self, session_id: str) -> Optional[ConversationSession]:
+        """Drop a finished session (after it has been logged)."""
+        self._expires_at.pop(session_id, None)
+        return self.sessions.pop(session_id, None)
+    
+    def _evict_sessions(self) -> None:
+        """Drop idle-expired sessions, then the least recently used while over max_sessions."""
+        now = time.monotonic()
+        evicted = 0
+        while self.sessions:
+            session_id = next(iter(self.sessions))
+            if self._expires_at[session_id] > now and len(self.sessions) < self.max_sessions:
+                break
+            self.end_session(session_id)
+            evicted += 1
+        
+        if evicted:
+            self.evicted_sessions += evicted
+            logger.info(
+                "🧹 Evicted %d sessions (%d total, %d active)",
+                evicted, self.evicted_sessions, len(self.sessions)
+            )
     
     async def process_audio_turn(
         self,
         audio_file_path: str,
         session_id: str,
-        output_audio_dir: str = "tests/tts"
+        output_audio_dir: str = "tests/tts",
+        transcription: Optional[TranscriptionResult] = None
     ) -> OrchestratorResult:
         """
         Process a complete conversation turn from audio input.
@@ -105,13 +185,15 @@ class ConversationOrchestrator:
         Flow:
         1. Transcribe audio (ASR)
         2. Process with LLM brain
-        3. Generate response audio (TTS)
+        3. Generate response audio (TTS), sentence by sentence as the LLM
+           streams its reply
         4. Update session state
         
         Args:
             audio_file_path: Path to caller's audio
             session_id: Session ID
             output_audio_dir: Where to save response audio
+            transcription: Already-computed transcription of audio_file (skips ASR)
             
         Returns:
             OrchestratorResult with full turn data
@@ -121,25 +203,47 @@ class ConversationOrchestrator:
             raise ValueError(f"Session {session_id} not found")
         
         # Step 1: Transcribe audio (ASR)
-        print(f"🎤 Transcribing audio...")
-        transcription = await self.asr.transcribe_file(audio_file_path)
+        if transcription is None:
+            logger.debug("🎤 Transcribing audio...")
+            transcription = await self.asr.transcribe_file(audio_file_path)
         user_text = transcription.text
-        print(f"📝 User said: {user_text}")
+        logger.info("📝 User said: %s", user_text)
         
-        # Step 2: Process with brain (LLM)
-        response = await self.process_text_turn(user_text, session_id)
-        
-        # Step 3: Generate audio response (TTS)
-        bot_audio_path = None
-        if self.generate_audio:
-            print(f"🔊 Generating audio response...")
-            output_path = Path(output_audio_dir) / f"{session_id}_{len(session.conversation_history)}.mp3"
-            tts_result = await self.tts.synthesize_to_file(
-                response.bot_text,
-                str(output_path)
+        if not self.generate_audio:
+            response = await self.process_text_turn(user_text, session_id)
+            bot_audio_path = None
+        else:
+            # Steps 2+3: TTS consumes the reply text while the LLM is still
+            # streaming it, instead of waiting for the whole response
+            output_path = Path(output_audio_dir) / f"{session_id}_{session.turn_count}.mp3"
+            reply_deltas: asyncio.Queue = asyncio.Queue()
+            
+            async def text_stream():
+                while (delta := await reply_deltas.get()) is not None:
+                    yield delta
+            
+            logger.debug("🔊 Generating audio response...")
+            tts_task = asyncio.create_task(
+                self.tts.synthesize_stream_to_file(text_stream(), str(output_path))
             )
+            try:
+                response = await self.process_text_turn(
+                    user_text,
+                    session_id,
+                    on_message_delta=reply_deltas.put_nowait
+                )
+                
+                # Cached and fallback replies arrive whole
+                if not response.streamed:
+                    reply_deltas.put_nowait(response.bot_text)
+                reply_deltas.put_nowait(None)
+                
+                tts_result = await tts_task
+            finally:
+                tts_task.cancel()
+            
             bot_audio_path = tts_result.audio_file_path
-            print(f"✅ Audio saved: {bot_audio_path}")
+            logger.info("✅ Audio saved: %s", bot_audio_path)
         
         return OrchestratorResult(
             session_id=session_id,
@@ -149,13 +253,15 @@ class ConversationOrchestrator:
             intent=response.intent,
             booking_complete=response.booking_complete,
             needs_escalation=response.needs_escalation,
-            extracted_data=response.extracted_data
+            extracted_data=response.extracted_data,
+            streamed=response.streamed
         )
     
     async def process_text_turn(
         self,
         user_text: str,
-        session_id: str
+        session_id: str,
+        on_message_delta: Optional[Callable[[str], None]] = None
     ) -> OrchestratorResult:
         """
         Process a conversation turn from text input (skips ASR/TTS).
@@ -165,6 +271,8 @@ class ConversationOrchestrator:
         Args:
             user_text: User's message
             session_id: Session ID
+            on_message_delta: Called with pieces of the reply text as the LLM
+                streams them (see ZylinBrain.process_message)
             
         Returns:
             OrchestratorResult
@@ -174,18 +282,28 @@ class ConversationOrchestrator:
             raise ValueError(f"Session {session_id} not found")
         
         # Process with LLM brain
-        print(f"🧠 Processing with Zylin brain...")
+        logger.debug("🧠 Processing with Zylin brain...")
+        streamed_parts = []
+        
+        def on_delta(delta: str) -> None:
+            streamed_parts.append(delta)
+            on_message_delta(delta)
+        
         llm_response: ConversationResponse = await self.brain.process_message(
             user_text,
-            session.conversation_history
+            session.get_conversation_for_llm(),
+            on_message_delta=on_delta if on_message_delta else None
         )
         
-        bot_text = llm_response.message
-        print(f"🤖 Zylin says: {bot_text}")
+        # Record what was streamed (and so spoken): if the reply failed to
+        # parse after part of it streamed, llm_response is the fallback
+        bot_text = "".join(streamed_parts) or llm_response.message
+        logger.info("🤖 Zylin says: %s", bot_text)
         
         # Update session
-        session.conversation_history.append({"role": "user", "content": user_text})
-        session.conversation_history.append({"role": "assistant", "content": bot_text})
+        session.add_message("user", user_text)
+        session.add_message("assistant", bot_text)
+        session.turn_count += 1
         session.intent = llm_response.intent
         
         # Merge extracted data
@@ -204,7 +322,8 @@ class ConversationOrchestrator:
             intent=llm_response.intent,
             booking_complete=llm_response.booking_complete,
             needs_escalation=llm_response.needs_escalation,
-            extracted_data=extracted
+            extracted_data=extracted,
+            streamed=bool(streamed_parts)
         )
     
     async def run_conversation(
@@ -230,24 +349,42 @@ class ConversationOrchestrator:
         print(f"🎬 Starting conversation session: {session.session_id}")
         print(f"{'='*60}\n")
         
-        # Process each audio file as a turn
-        for i, audio_file in enumerate(audio_files, 1):
-            print(f"\n--- Turn {i} ---")
-            
-            result = await self.process_audio_turn(
-                audio_file,
-                session.session_id,
-                output_audio_dir
-            )
-            
-            print(f"📊 Intent: {result.intent}")
-            if result.extracted_data:
-                print(f"📝 Extracted: {result.extracted_data}")
-            
-            # Stop if conversation is complete
-            if session.completed:
-                print(f"\n✅ Conversation completed (intent: {session.intent})")
-                break
+        # Transcribe one turn ahead: turn N+1's ASR runs while turn N is in LLM/TTS
+        next_transcription = None
+        if audio_files:
+            next_transcription = asyncio.create_task(self.asr.transcribe_file(audio_files[0]))
+        
+        try:
+            # Process each audio file as a turn
+            for i, audio_file in enumerate(audio_files, 1):
+                print(f"\n--- Turn {i} ---")
+                
+                transcription = await next_transcription
+                next_transcription = None
+                if i < len(audio_files):
+                    next_transcription = asyncio.create_task(
+                        self.asr.transcribe_file(audio_files[i])
+                    )
+                
+                result = await self.process_audio_turn(
+                    audio_file,
+                    session.session_id,
+                    output_audio_dir,
+                    transcription=transcription
+                )
+                
+                print(f"📊 Intent: {result.intent}")
+                if result.extracted_data:
+                    print(f"📝 Extracted: {result.extracted_data}")
+                
+                # Stop if conversation is complete
+                if session.completed:
+                    print(f"\n✅ Conversation completed (intent: {session.intent})")
+                    break
+        finally:
+            # The prefetched turn is unused if the conversation ended early
+            if next_transcription is not None:
+                next_transcription.cancel()
         
         print(f"\n{'='*60}")
         print(f"🏁 Conversation session ended")
@@ -256,18 +393,28 @@ class ConversationOrchestrator:
         return session
     
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
-        """Get a summary of a conversation session."""
+        """
+        Get a summary of a conversation session.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            Summary dict, or {"error": ...} if the session doesn't exist
+        """
         session = self.get_session(session_id)
         if not session:
             return {"error": "Session not found"}
         
+        conversation = list(session.conversation_history)
+        
         return {
             "session_id": session.session_id,
             "caller_phone": session.caller_phone,
             "start_time": session.start_time.isoformat(),
-            "turn_count": len(session.conversation_history) // 2,
+            "turn_count": session.turn_count,
             "intent": session.intent,
             "booking_data": session.booking_data,
             "completed": session.completed,
-            "conversation": session.conversation_history
+            "conversation": conversation
         }
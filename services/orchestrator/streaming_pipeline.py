@@ -4,18 +4,22 @@ Orchestrates ASR → LLM → TTS flow for low-latency phone calls.
 """
 
 import asyncio
+import logging
 from typing import Optional, AsyncGenerator, Dict
 from datetime import datetime
 import time
 import os
 
 from services.asr.transcribe import StreamingASRService, MockStreamingASR
-from services.llm.brain import ZylinBrain, BusinessContext
+from services.llm.brain import ZylinBrain, BusinessContext, get_default_brain
 from services.tts.synthesize import StreamingTTSService, MockStreamingTTS
 from services.utils.audio_codec import AudioCodec, AudioBuffer
+from services.utils.audio_channel import AudioOutChannel
 from services.bookings.store import BookingTool
 from services.notifications.whatsapp import WhatsAppService
-from services.logging.log_store import CallLogStore, CallLog
+from services.logging.log_store import CallLogStore, CallLog, encode_transcript
+
+logger = logging.getLogger(__name__)
 
 
 class StreamingSession:
@@ -27,7 +31,8 @@ class StreamingSession:
         self,
         session_id: str,
         caller_phone: Optional[str] = None,
-        stream_sid: Optional[str] = None
+        stream_sid: Optional[str] = None,
+        window_size: int = 10
     ):
         """
         Initialize streaming session.
@@ -36,12 +41,21 @@ class StreamingSession:
             session_id: Unique session identifier
             caller_phone: Caller's phone number
             stream_sid: Twilio stream SID
+            window_size: Minimum recent turns (user + assistant pairs) sent to
+                the LLM; the context grows to twice this before being trimmed
         """
         self.session_id = session_id
         self.caller_phone = caller_phone
         self.stream_sid = stream_sid
         self.created_at = datetime.now()
         self.conversation_history = []  # List of {role, content, timestamp}
+        
+        # LLM context as {role, content}, append-only between trims so each
+        # request repeats the previous one's prefix (OpenAI prompt-cache hits).
+        # Once it reaches 2 * window_size turns it restarts from the latest
+        # window_size turns.
+        self.window_messages = 2 * window_size
+        self._llm_view: list[dict] = []
         self.audio_buffer = AudioBuffer(max_duration_ms=10000)  # 10 seconds max
         self.is_active = True
         self.latency_metrics = []  # Track latency for each turn
@@ -53,13 +67,14 @@ class StreamingSession:
             "content": content,
             "timestamp": datetime.now()
         })
+        
+        if len(self._llm_view) >= 2 * self.window_messages:
+            self._llm_view = self._llm_view[-self.window_messages:]
+        self._llm_view.append({"role": role, "content": content})
     
     def get_conversation_for_llm(self) -> list[dict]:
-        """Get conversation history formatted for LLM."""
-        return [
-            {"role": msg["role"], "content": msg["content"]}
-            for msg in self.conversation_history
-        ]
+        """Get conversation history formatted for LLM (shared list, don't mutate)."""
+        return self._llm_view
     
     def add_latency_metric(self, metric_name: str, duration_ms: float) -> None:
         """Track latency for monitoring."""
@@ -85,7 +100,9 @@ class StreamingPipeline:
     def __init__(
         self,
         use_mock_services: bool = False,
-        max_latency_target_ms: float = 3000  # 3 second target
+        max_latency_target_ms: float = 3000,  # 3 second target
+        window_size: int = 10,
+        brain: Optional[ZylinBrain] = None
     ):
         """
         Initialize streaming pipeline.
@@ -93,9 +110,23 @@ class StreamingPipeline:
         Args:
             use_mock_services: Use mock ASR/TTS for testing without API costs
             max_latency_target_ms: Target max latency (for monitoring)
+            window_size: Recent turns of each call sent to the LLM as context
+            brain: LLM brain instance (defaults to the shared one)
         """
         self.use_mock_services = use_mock_services
         self.max_latency_target_ms = max_latency_target_ms
+        self.window_size = window_size
+        
+        # Business settings used on every turn, resolved once per pipeline
+        self.business_name = os.getenv("BUSINESS_NAME", "Our Business")
+        self.owner_phone = os.getenv("OWNER_PHONE", "+919876543210")
+        
+        # Outgoing audio is batched into media events of this many PCM bytes
+        # (16-bit samples, so 2 bytes per sample at 8 kHz)
+        self.media_out_batch_bytes = max(
+            AudioCodec.CHUNK_SIZE_BYTES * 2,
+            int(os.getenv("MEDIA_OUT_BATCH_MS", "80")) * AudioCodec.SAMPLE_RATE // 1000 * 2
+        )
         
         # Initialize services
         if use_mock_services:
@@ -106,12 +137,12 @@ class StreamingPipeline:
             if os.getenv("DEEPGRAM_API_KEY"):
                 self.asr = StreamingASRService()
             else:
-                print("⚠️  No DEEPGRAM_API_KEY found, using mock ASR")
+                logger.warning("⚠️  No DEEPGRAM_API_KEY found, using mock ASR")
                 self.asr = MockStreamingASR()
             
             self.tts = StreamingTTSService()
         
-        self.brain = ZylinBrain()
+        self.brain = brain or get_default_brain()
         self.booking_tool = BookingTool()
         self.whatsapp_service = WhatsAppService()
         self.log_store = CallLogStore()
@@ -126,9 +157,9 @@ class StreamingPipeline:
         stream_sid: Optional[str] = None
     ) -> StreamingSession:
         """Create new streaming session."""
-        session = StreamingSession(session_id, caller_phone, stream_sid)
+        session = StreamingSession(session_id, caller_phone, stream_sid, self.window_size)
         self.sessions[session_id] = session
-        print(f"📞 Created streaming session: {session_id}")
+        logger.info("📞 Created streaming session: %s", session_id)
         return session
     
     def get_session(self, session_id: str) -> Optional[StreamingSession]:
@@ -145,13 +176,13 @@ class StreamingPipeline:
             self._log_call(session)
             
             del self.sessions[session_id]
-            print(f"📞 Closed streaming session: {session_id}")
+            logger.info("📞 Closed streaming session: %s", session_id)
     
     async def process_call_stream(
         self,
         session_id: str,
         audio_input_stream: AsyncGenerator[bytes, None],
-        audio_output_queue: asyncio.Queue
+        audio_output_queue: AudioOutChannel
     ) -> None:
         """
         Process complete call stream.
@@ -161,15 +192,15 @@ class StreamingPipeline:
         Args:
             session_id: Session identifier
             audio_input_stream: Incoming audio chunks (PCM from Twilio)
-            audio_output_queue: Queue to send outgoing audio chunks
+            audio_output_queue: Channel to send outgoing audio chunks
         """
         session = self.get_session(session_id)
         if not session:
-            print(f"❌ Session not found: {session_id}")
+            logger.warning("❌ Session not found: %s", session_id)
             return
         
         try:
-            print(f"\n🎙️  Starting streaming pipeline for session {session_id}")
+            logger.info("🎙️  Starting streaming pipeline for session %s", session_id)
             
             # Process audio turns until call ends
             async for transcript, is_final in self.asr.transcribe_stream(
@@ -180,7 +211,7 @@ class StreamingPipeline:
                 if not is_final:
                     continue  # Skip interim results
                 
-                print(f"\n📝 User said: {transcript}")
+                logger.info("📝 User said: %s", transcript)
                 
                 # Process this utterance
                 await self._process_utterance(
@@ -190,9 +221,7 @@ class StreamingPipeline:
                 )
         
         except Exception as e:
-            print(f"❌ Error in streaming pipeline: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error in streaming pipeline: %s", e)
         
         finally:
             # Clean up
@@ -202,69 +231,100 @@ class StreamingPipeline:
         self,
         session: StreamingSession,
         transcript: str,
-        audio_output_queue: asyncio.Queue
+        audio_output_queue: AudioOutChannel
     ) -> None:
         """
         Process a single user utterance through the pipeline.
         
         Flow: Transcript → LLM → TTS → Audio Output
+        
+        The reply text is handed to TTS while the LLM is still streaming it,
+        so audio starts before the full response (intent, extracted data)
+        has arrived.
         """
         start_time = time.time()
         
-        # Add user message to history
-        session.add_message("user", transcript)
-        
-        # Step 1: Process with LLM (with timing)
-        llm_start = time.time()
-        
+        # Step 1: Start the LLM, streaming its reply text into a queue.
+        # The brain appends the new user message itself, so history is passed
+        # before it's recorded (otherwise the prompt repeats the utterance)
         conversation_history = session.get_conversation_for_llm()
-        response = await self.brain.process_message(transcript, conversation_history)
-        
-        llm_duration = (time.time() - llm_start) * 1000
-        session.add_latency_metric("llm_processing", llm_duration)
+        reply_deltas: asyncio.Queue = asyncio.Queue()
+        streamed_parts = []
         
-        print(f"🧠 LLM response ({llm_duration:.0f}ms): {response.reply[:80]}...")
-        print(f"📊 Intent: {response.intent}, Booking: {response.booking_complete}, Urgent: {response.needs_escalation}")
+        def on_message_delta(delta: str) -> None:
+            streamed_parts.append(delta)
+            reply_deltas.put_nowait(delta)
         
-        # Add assistant message to history
-        session.add_message("assistant", response.reply)
+        llm_task = asyncio.create_task(self.brain.process_message(
+            transcript,
+            conversation_history,
+            on_message_delta=on_message_delta
+        ))
+        llm_task.add_done_callback(lambda _: reply_deltas.put_nowait(None))
         
-        # Step 2: Handle actions (bookings, escalations)
-        await self._handle_actions(session, response)
+        async def text_stream():
+            while (delta := await reply_deltas.get()) is not None:
+                yield delta
+            
+            # Cached and fallback replies arrive whole
+            if not streamed_parts:
+                yield (await llm_task).message
         
-        # Step 3: Generate and stream audio response
-        tts_start = time.time()
+        # Step 2: Generate and stream audio as the reply text arrives
+        audio_task = asyncio.create_task(
+            self._enqueue_audio(text_stream(), audio_output_queue)
+        )
         
-        # Create text stream from LLM response (simulate streaming)
-        async def text_stream():
-            yield response.reply
-        
-        # Generate audio chunks
-        audio_chunks_sent = 0
-        async for audio_chunk in self.tts.synthesize_stream_for_twilio(text_stream()):
-            # Convert to μ-law and enqueue
-            mulaw_base64 = AudioCodec.encode_pcm_to_mulaw_base64(audio_chunk)
-            await audio_output_queue.put({
-                "event": "media",
-                "media": {
-                    "payload": mulaw_base64
-                }
-            })
-            audio_chunks_sent += 1
+        try:
+            response = await llm_task
+            
+            llm_duration = (time.time() - start_time) * 1000
+            session.add_latency_metric("llm_processing", llm_duration)
+            
+            # Add user message to history
+            session.add_message("user", transcript)
+            
+            logger.info("🧠 LLM response (%.0fms): %.80s", llm_duration, response.message)
+            logger.info(
+                "📊 Intent: %s, Booking: %s, Urgent: %s",
+                response.intent, response.booking_complete, response.needs_escalation
+            )
+            
+            # Record what the caller hears. If the reply failed to parse after
+            # part of it streamed, that partial text was spoken, not the
+            # fallback message in response.
+            spoken_text = "".join(streamed_parts) or response.message
+            if spoken_text != response.message:
+                logger.warning("⚠️  LLM reply changed after streaming; recording the spoken text")
+            
+            # Add assistant message to history
+            session.add_message("assistant", spoken_text)
+            
+            # Step 3: Handle actions (bookings, escalations) while audio plays out
+            await self._handle_actions(session, response)
+            
+            audio_chunks_sent = await audio_task
+        finally:
+            llm_task.cancel()
+            audio_task.cancel()
         
-        tts_duration = (time.time() - tts_start) * 1000
+        # TTS runs alongside the LLM, so it's timed from the start of the turn
+        tts_duration = (time.time() - start_time) * 1000
         session.add_latency_metric("tts_generation", tts_duration)
         
         # Total latency
         total_duration = (time.time() - start_time) * 1000
         session.add_latency_metric("end_to_end", total_duration)
         
-        print(f"🔊 Audio sent ({audio_chunks_sent} chunks, TTS: {tts_duration:.0f}ms)")
-        print(f"⏱️  Total latency: {total_duration:.0f}ms (target: {self.max_latency_target_ms}ms)")
+        logger.info("🔊 Audio sent (%d chunks, TTS: %.0fms)", audio_chunks_sent, tts_duration)
+        logger.info("⏱️  Total latency: %.0fms (target: %sms)", total_duration, self.max_latency_target_ms)
         
         # Warn if over latency target
         if total_duration > self.max_latency_target_ms:
-            print(f"⚠️  Latency exceeded target by {total_duration - self.max_latency_target_ms:.0f}ms")
+            logger.warning(
+                "⚠️  Latency exceeded target by %.0fms",
+                total_duration - self.max_latency_target_ms
+            )
     
     async def _handle_actions(self, session: StreamingSession, response) -> None:
         """
@@ -272,7 +332,7 @@ class StreamingPipeline:
         """
         # Handle booking
         if response.intent == "booking" and response.booking_complete:
-            print("📅 Creating booking...")
+            logger.info("📅 Creating booking...")
             try:
                 booking = self.booking_tool.create_booking_from_conversation(
                     response.extracted_data,
@@ -281,28 +341,30 @@ class StreamingPipeline:
                 
                 # Send WhatsApp confirmation
                 if session.caller_phone:
-                    self.whatsapp_service.send_booking_confirmation(
+                    await asyncio.to_thread(
+                        self.whatsapp_service.send_booking_confirmation,
                         customer_name=booking.customer_name,
                         customer_phone=booking.customer_phone,
                         appointment_date=booking.appointment_date,
                         appointment_time=booking.appointment_time,
-                        business_name=os.getenv("BUSINESS_NAME", "Our Business")
+                        business_name=self.business_name
                     )
             except Exception as e:
-                print(f"❌ Error creating booking: {e}")
+                logger.error("❌ Error creating booking: %s", e)
         
         # Handle urgent escalation
         elif response.intent == "urgent" and response.needs_escalation:
-            print("🚨 Escalating to owner...")
+            logger.info("🚨 Escalating to owner...")
             try:
-                self.whatsapp_service.send_urgent_alert(
-                    owner_phone=os.getenv("OWNER_PHONE", "+919876543210"),
+                await asyncio.to_thread(
+                    self.whatsapp_service.send_urgent_alert,
+                    owner_phone=self.owner_phone,
                     caller_phone=session.caller_phone or "Unknown",
                     issue_summary=response.extracted_data.get("issue_summary", "Urgent issue"),
-                    business_name=os.getenv("BUSINESS_NAME", "Our Business")
+                    business_name=self.business_name
                 )
             except Exception as e:
-                print(f"❌ Error sending alert: {e}")
+                logger.error("❌ Error sending alert: %s", e)
     
     def _log_call(self, session: StreamingSession) -> None:
         """
@@ -336,22 +398,22 @@ class StreamingPipeline:
             log = CallLog(
                 session_id=session.session_id,
                 caller_phone=session.caller_phone,
-                timestamp=session.created_at.isoformat(),
+                start_time=session.created_at.isoformat(),
                 intent=intent,
-                transcript=session.conversation_history,
+                transcript=encode_transcript(session.conversation_history),
                 summary=f"Streaming call, {len(session.conversation_history)} messages, avg latency {avg_latency:.0f}ms"
             )
             
             self.log_store.create_log(log)
-            print(f"📝 Call logged: {session.session_id}")
+            logger.info("📝 Call logged: %s", session.session_id)
         
         except Exception as e:
-            print(f"❌ Error logging call: {e}")
+            logger.exception("❌ Error logging call: %s", e)
     
     async def send_greeting(
         self,
         session_id: str,
-        audio_output_queue: asyncio.Queue
+        audio_output_queue: AudioOutChannel
     ) -> None:
         """
         Send initial greeting to caller.
@@ -371,18 +433,56 @@ class StreamingPipeline:
         async def text_stream():
             yield greeting
         
-        print(f"👋 Sending greeting: {greeting}")
+        logger.info("👋 Sending greeting: %s", greeting)
+        
+        await self._enqueue_audio(text_stream(), audio_output_queue)
         
-        async for audio_chunk in self.tts.synthesize_stream_for_twilio(text_stream()):
-            mulaw_base64 = AudioCodec.encode_pcm_to_mulaw_base64(audio_chunk)
-            await audio_output_queue.put({
+        logger.debug("✅ Greeting sent")
+    
+    async def _enqueue_audio(
+        self,
+        text_stream: AsyncGenerator[str, None],
+        audio_output_queue: AudioOutChannel
+    ) -> int:
+        """
+        Synthesize text and enqueue it as Twilio media events.
+        
+        TTS chunks are coalesced into media_out_batch_bytes of PCM before
+        encoding, so the queue and the WebSocket writer handle one message
+        per batch instead of one per chunk. Enqueueing never awaits, since the
+        channel is unbounded. Batches stay ordinary "media"
+        events; Twilio plays payloads of any length back to back.
+        
+        Args:
+            text_stream: Text to speak
+            audio_output_queue: Channel drained by the Twilio WebSocket writer
+            
+        Returns:
+            Number of media events enqueued
+        """
+        pending = bytearray()
+        events_sent = 0
+        
+        def flush():
+            audio_output_queue.put_nowait({
                 "event": "media",
                 "media": {
-                    "payload": mulaw_base64
+                    "payload": AudioCodec.encode_pcm_to_mulaw_base64(bytes(pending))
                 }
             })
+            pending.clear()
+        
+        async for audio_chunk in self.tts.synthesize_stream_for_twilio(text_stream):
+            pending += audio_chunk
+            if len(pending) >= self.media_out_batch_bytes:
+                flush()
+                events_sent += 1
         
-        print("✅ Greeting sent")
+        if pending:
+            flush()
+            events_sent += 1
+        
+        return events_sent
 
 
 # Example usage for testing
@@ -423,5 +523,11 @@ if __name__ == "__main__":
         
         print("\n✅ Pipeline test complete!")
     
-    # Run test
+    # Run test on uvloop when installed, matching the uvicorn server loop
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(test_pipeline())
@@ -18,6 +18,8 @@ import aiofiles
 Voice = Literal["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
 # Audio formats
 AudioFormat = Literal["mp3", "opus", "aac", "flac"]
+# Where streamed text is cut into sentences for synthesis
+SENTENCE_ENDINGS = (".", "!", "?", "\n")
 
 
 class TTSResult(BaseModel):
@@ -153,16 +155,89 @@ class TTSService:
                 response_format=format
             )
             
-            # Collect all bytes
-            audio_bytes = b""
-            async for chunk in response.iter_bytes():
-                audio_bytes += chunk
+            # Collect all bytes (joined once instead of re-copying per chunk)
+            chunks = [chunk async for chunk in response.iter_bytes()]
+            return b"".join(chunks)
             
-            return audio_bytes
+        except Exception as e:
+            print(f"❌ Error synthesizing speech: {e}")
+            raise
+    
+    async def synthesize_stream_to_file(
+        self,
+        text_stream: AsyncGenerator[str, None],
+        output_path: str,
+        voice: Optional[Voice] = None,
+        speed: Optional[float] = None
+    ) -> TTSResult:
+        """
+        Convert streamed text to speech one sentence at a time, into one MP3 file.
+        
+        Each sentence is synthesized as soon as it is complete, so audio for
+        the start of a reply is generated while the rest is still being
+        written. MP3 frames from consecutive requests play back as one file.
+        
+        Args:
+            text_stream: Async generator yielding text chunks (e.g. from the LLM)
+            output_path: Path where audio file will be saved
+            voice: Voice to use (overrides default)
+            speed: Speech speed (overrides default)
+            
+        Returns:
+            TTSResult with file path and metadata
+        """
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        selected_voice = voice or self.default_voice
+        selected_speed = speed or self.default_speed
+        spoken = []
+        
+        async def write_sentence(f, sentence: str) -> None:
+            sentence = sentence.strip()
+            if not sentence:
+                return
+            response = await self.client.audio.speech.create(
+                model=self.model,
+                voice=selected_voice,
+                input=sentence,
+                speed=selected_speed,
+                response_format="mp3"
+            )
+            async for chunk in response.iter_bytes():
+                await f.write(chunk)
+            spoken.append(sentence)
+        
+        try:
+            async with aiofiles.open(output_path, 'wb') as f:
+                buffer = ""
+                async for text_chunk in text_stream:
+                    buffer += text_chunk
+                    
+                    # Synthesize up to the last complete sentence
+                    cut = max(buffer.rfind(ending) for ending in SENTENCE_ENDINGS)
+                    if cut >= 0:
+                        await write_sentence(f, buffer[:cut + 1])
+                        buffer = buffer[cut + 1:]
+                
+                await write_sentence(f, buffer)
             
         except Exception as e:
             print(f"❌ Error synthesizing speech: {e}")
             raise
+        
+        if not spoken:
+            raise ValueError("Text cannot be empty")
+        
+        text = " ".join(spoken)
+        word_count = len(text.split())
+        
+        return TTSResult(
+            audio_file_path=str(output_path),
+            text=text,
+            voice=selected_voice,
+            duration_estimate=(word_count / 150) * 60 / selected_speed
+        )
 
 
 # Utility function for quick synthesis
@@ -232,13 +307,12 @@ class StreamingTTSService:
             Audio bytes (PCM 16-bit, 24kHz or MP3)
         """
         sentence_buffer = ""
-        sentence_endings = [".", "!", "?", "\n"]
         
         async for text_chunk in text_stream:
             sentence_buffer += text_chunk
             
             # Check if we have a complete sentence
-            has_ending = any(ending in text_chunk for ending in sentence_endings)
+            has_ending = any(ending in text_chunk for ending in SENTENCE_ENDINGS)
             
             if has_ending or len(sentence_buffer) > 200:  # Max buffer size
                 # Generate audio for this sentence
@@ -328,11 +402,8 @@ class StreamingTTSService:
             response_format=output_format
         )
         
-        audio_bytes = b""
-        async for chunk in response.iter_bytes():
-            audio_bytes += chunk
-        
-        return audio_bytes
+        chunks = [chunk async for chunk in response.iter_bytes()]
+        return b"".join(chunks)
 
 
 class MockStreamingTTS:
@@ -395,8 +466,5 @@ class MockStreamingTTS:
         async def text_gen():
             yield text
         
-        audio_bytes = b""
-        async for chunk in self.synthesize_stream(text_gen(), output_format):
-            audio_bytes += chunk
-        
-        return audio_bytes
+        chunks = [chunk async for chunk in self.synthesize_stream(text_gen(), output_format)]
+        return b"".join(chunks)
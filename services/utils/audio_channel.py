@@ -0,0 +1,77 @@
+"""
+Audio Output Channel
+Single-producer, single-consumer hand-off for outgoing call audio.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+
+class AudioOutChannel:
+    """
+    Deque plus a one-shot wakeup future, used in place of asyncio.Queue.
+
+    The pipeline appends media events without awaiting, and the WebSocket
+    writer drains everything queued so far in one call. With one producer
+    and one consumer per call there is nothing for asyncio.Queue's getter
+    and putter bookkeeping to coordinate.
+
+    Usage:
+        channel = AudioOutChannel()
+        channel.put_nowait({"event": "media", ...})
+        for message in await channel.get_batch():
+            ...
+        channel.close()
+    """
+
+    def __init__(self):
+        """Initialize an empty, open channel."""
+        self._items: Deque[Any] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+
+    def put_nowait(self, item: Any) -> None:
+        """
+        Append an item and wake the consumer.
+
+        Args:
+            item: Message to deliver
+        """
+        self._items.append(item)
+        self._wake()
+
+    def close(self) -> None:
+        """Stop the consumer once it has drained the remaining items."""
+        self._closed = True
+        self._wake()
+
+    def qsize(self) -> int:
+        """Return the number of undelivered items."""
+        return len(self._items)
+
+    async def get_batch(self) -> List[Any]:
+        """
+        Wait for items and return all of them at once.
+
+        Returns:
+            Every queued item in order, or an empty list once the channel
+            is closed and drained
+        """
+        while not self._items:
+            if self._closed:
+                return []
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        batch = list(self._items)
+        self._items.clear()
+        return batch
+
+    def _wake(self) -> None:
+        """Resolve the pending waiter, if the consumer is blocked."""
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
@@ -5,7 +5,7 @@ Handles μ-law encoding/decoding and audio format conversion.
 
 import audioop
 import base64
-from typing import Optional
+from typing import Optional, Iterable
 
 
 class AudioCodec:
@@ -38,10 +38,35 @@ class AudioCodec:
         # Decode base64
         mulaw_bytes = base64.b64decode(base64_data)
         
-        # Convert μ-law to PCM (linear 16-bit)
-        pcm_bytes = audioop.ulaw2lin(mulaw_bytes, 2)  # 2 = 16-bit samples
+        return AudioCodec.mulaw_to_pcm(mulaw_bytes)
+    
+    @staticmethod
+    def decode_mulaw_base64_batch(payloads: Iterable[str]) -> bytes:
+        """
+        Decode several base64 μ-law frames into one contiguous PCM buffer.
+        
+        Args:
+            payloads: Base64-encoded μ-law frames, in order
+            
+        Returns:
+            16-bit PCM audio bytes for all frames
+        """
+        mulaw_bytes = b"".join(base64.b64decode(payload) for payload in payloads)
+        return AudioCodec.mulaw_to_pcm(mulaw_bytes)
+    
+    @staticmethod
+    def mulaw_to_pcm(mulaw_bytes: bytes) -> bytes:
+        """
+        Convert raw μ-law bytes to 16-bit PCM.
         
-        return pcm_bytes
+        Args:
+            mulaw_bytes: Raw μ-law audio
+            
+        Returns:
+            16-bit PCM audio bytes
+        """
+        # Convert μ-law to PCM (linear 16-bit)
+        return audioop.ulaw2lin(mulaw_bytes, 2)  # 2 = 16-bit samples
     
     @staticmethod
     def encode_pcm_to_mulaw_base64(pcm_bytes: bytes) -> str:
@@ -0,0 +1,41 @@
+"""
+ID Generation
+Time-ordered UUIDs for session and call-log keys.
+"""
+
+import os
+import time
+import uuid
+
+_TIMESTAMP_MASK = (1 << 48) - 1
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a version 7 UUID (RFC 9562).
+
+    The top 48 bits are the Unix time in milliseconds, so IDs made in a later
+    millisecond sort after earlier ones and new rows land at the right edge of
+    indexes keyed on them. The remaining 74 bits come from os.urandom, so IDs
+    stay as hard to guess as uuid4.
+
+    Returns:
+        A version 7 UUID
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+
+    value = (
+        (timestamp_ms & _TIMESTAMP_MASK) << 80
+        | 0x7 << 76                          # version
+        | ((rand >> 62) & 0xFFF) << 64       # rand_a (12 bits)
+        | 0b10 << 62                         # RFC variant
+        | (rand & _RAND_B_MASK)              # rand_b (62 bits)
+    )
+    return uuid.UUID(int=value)
+
+
+def new_session_id() -> str:
+    """Return a new time-ordered session ID string."""
+    return str(uuid7())
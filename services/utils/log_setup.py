@@ -0,0 +1,57 @@
+"""
+Logging Setup
+Queue-based logging so request handlers never block on stdout writes.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+def setup_queue_logging(level: str = "INFO") -> logging.handlers.QueueListener:
+    """
+    Route root logger output through a queue drained by a background thread.
+
+    Callers only pay for a non-blocking queue put; the QueueListener thread
+    does the actual formatting and stdout writes.
+
+    Args:
+        level: Root log level name (e.g. "INFO", "DEBUG")
+
+    Returns:
+        Started QueueListener (pass to stop_queue_logging on shutdown)
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener: Optional[logging.handlers.QueueListener]) -> None:
+    """
+    Flush pending records and detach the queue handler from the root logger.
+
+    Args:
+        listener: Listener returned by setup_queue_logging
+    """
+    if listener is None:
+        return
+
+    listener.stop()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
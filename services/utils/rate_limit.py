@@ -0,0 +1,69 @@
+"""
+Rate Limiting
+Async token bucket for pacing calls to rate-limited APIs.
+"""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket shared by concurrent coroutines.
+
+    Allows bursts up to max_rate calls, then refills at max_rate per
+    time_period. Callers wait for a token instead of hitting the API and
+    backing off on 429 responses.
+
+    Usage:
+        limiter = AsyncRateLimiter(max_rate=50, time_period=60)
+        async with limiter:
+            await client.call()
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        """
+        Initialize rate limiter.
+
+        Args:
+            max_rate: Calls allowed per time_period (also the burst size)
+            time_period: Window length in seconds
+        """
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._rate_per_sec = max_rate / time_period
+        self._tokens = float(max_rate)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_rate,
+            self._tokens + (now - self._updated_at) * self._rate_per_sec
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # The lock keeps waiters in FIFO order so one caller can't starve the rest
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate_per_sec)
+                self._refill()
+                # The loop may wake a timer marginally early, and float rounding can
+                # leave 0.999... tokens; the token we slept for is ours either way
+                self._tokens = max(self._tokens, 1.0)
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
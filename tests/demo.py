@@ -236,7 +236,7 @@ async def show_analytics():
     # Show bookings
     from services.bookings.store import BookingStore
     booking_store = BookingStore()
-    bookings = booking_store.list_bookings(limit=10)
+    bookings = booking_store.list_booking_rows(limit=10)
     
     if bookings:
         print(f"\n📅 Recent Bookings:")
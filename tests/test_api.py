@@ -98,3 +98,18 @@ def test_invalid_conversation_request(client):
     response = client.post("/conversation", json=request_data)
     
     assert response.status_code == 422  # Validation error
+
+
+def test_voice_webhook_uses_current_public_url(client, monkeypatch):
+    """Test that PUBLIC_URL set after import still reaches the Stream TwiML."""
+    call = {"CallSid": "CA123", "From": "+919876543210", "To": "+14155238886", "CallStatus": "ringing"}
+    
+    monkeypatch.setenv("PUBLIC_URL", "https://first.example.com")
+    response = client.post("/api/twilio/voice", data=call)
+    assert response.status_code == 200
+    assert '<Stream url="wss://first.example.com/media-stream">' in response.text
+    assert '<Parameter name="callSid" value="CA123" />' in response.text
+    
+    monkeypatch.setenv("PUBLIC_URL", "https://second.example.com")
+    response = client.post("/api/twilio/voice", data=call)
+    assert '<Stream url="wss://second.example.com/media-stream">' in response.text
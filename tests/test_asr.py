@@ -0,0 +1,123 @@
+"""
+ASR Service Tests
+Tests the Whisper client lifecycle and transcript helpers without network access.
+"""
+
+import httpx
+import pytest
+
+from services.asr import transcribe as asr_module
+from services.asr.transcribe import (
+    ASRService,
+    close_default_asr,
+    get_default_asr,
+    merge_overlapping_text,
+)
+
+RealAsyncClient = httpx.AsyncClient
+
+
+def mock_whisper_client(requests):
+    """Return an httpx.AsyncClient factory whose requests hit a fake Whisper endpoint."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"text": " hello from whisper "})
+
+    def factory(**kwargs):
+        kwargs.pop("http2", None)
+        return RealAsyncClient(transport=httpx.MockTransport(handler), **kwargs)
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_default_asr_recreated_after_close(monkeypatch):
+    """Closing the shared ASR service must not leave a closed client behind."""
+    requests = []
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(asr_module.httpx, "AsyncClient", mock_whisper_client(requests))
+    monkeypatch.setattr(asr_module, "_default_asr", None)
+
+    first = get_default_asr()
+    await close_default_asr()
+    assert first.http_client.is_closed
+
+    # A restarted app in the same process gets a fresh, usable service
+    second = get_default_asr()
+    assert second is not first
+    assert not second.http_client.is_closed
+
+    result = await second.transcribe_bytes(b"RIFF fake audio", filename="clip.wav")
+    assert result.text == "hello from whisper"
+    assert len(requests) == 1
+
+    await close_default_asr()
+
+
+def test_merge_exact_overlap():
+    """Test that words repeated across the segment overlap appear once."""
+    merged = merge_overlapping_text(
+        "we are open from nine to six",
+        "nine to six on weekdays"
+    )
+    assert merged == "we are open from nine to six on weekdays"
+
+
+def test_merge_without_overlap():
+    """Test that unrelated segments are simply joined."""
+    assert merge_overlapping_text("Hello there.", "How are you?") == "Hello there. How are you?"
+    assert merge_overlapping_text("", "How are you?") == "How are you?"
+    assert merge_overlapping_text("Hello there.", "") == "Hello there."
+
+
+def test_merge_partial_overlap():
+    """Test overlaps that cover only some words, ignoring case and punctuation."""
+    merged = merge_overlapping_text("Please book me for Monday.", "monday, at ten")
+    assert merged == "Please book me for Monday. at ten"
+
+    # Only the longest matching run is dropped, not every repeated word
+    merged = merge_overlapping_text("the clinic is open, the", "the doctor is in")
+    assert merged == "the clinic is open, the doctor is in"
+
+    # A word cut at the segment boundary can't be told from a real short word, so both stay
+    merged = merge_overlapping_text("see you on Mon", "Monday at ten")
+    assert merged == "see you on Mon Monday at ten"
+
+
+def test_merge_overlap_limited_to_max_words():
+    """Test that overlaps longer than max_words are not searched for."""
+    words = "one two three four"
+    assert merge_overlapping_text(words, words, max_words=3) == f"{words} {words}"
+    assert merge_overlapping_text(words, words, max_words=4) == words
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_api_call(tmp_path, monkeypatch):
+    """Test that cached results are reused, and language/prompt are part of the key."""
+    requests = []
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(asr_module.httpx, "AsyncClient", mock_whisper_client(requests))
+    audio = b"RIFF fake audio"
+
+    asr = ASRService(cache=True, cache_dir=str(tmp_path))
+    first = await asr.transcribe_bytes(audio, language="en", prompt="Clinic booking")
+    again = await asr.transcribe_bytes(audio, language="en", prompt="Clinic booking")
+    assert again == first
+    assert len(requests) == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # The cache is on disk, so a new service (or worker) reuses it too
+    other = ASRService(cache=True, cache_dir=str(tmp_path))
+    assert await other.transcribe_bytes(audio, language="en", prompt="Clinic booking") == first
+    assert len(requests) == 1
+
+    await asr.transcribe_bytes(audio, language="hi", prompt="Clinic booking")
+    assert len(requests) == 2
+    await asr.transcribe_bytes(audio, language="en", prompt="Pharmacy order")
+    assert len(requests) == 3
+    await asr.transcribe_bytes(audio + b"\x00", language="en", prompt="Clinic booking")
+    assert len(requests) == 4
+    assert len(list(tmp_path.glob("*.json"))) == 4
+
+    await asr.aclose()
+    await other.aclose()
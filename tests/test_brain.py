@@ -3,7 +3,7 @@ Unit tests for Zylin LLM brain service.
 """
 
 import pytest
-from services.llm.brain import ZylinBrain, ConversationResponse, ExtractedData
+from services.llm.brain import ZylinBrain, ConversationResponse, ExtractedData, JsonObjectScanner
 
 
 @pytest.mark.asyncio
@@ -98,3 +98,23 @@ async def test_conversation_summary(zylin_brain, sample_conversation_history):
     assert summary is not None
     assert len(summary) > 0
     assert isinstance(summary, str)
+
+
+def test_scanner_streams_message_field():
+    """Test the reply's message text is decoded and streamed as it arrives."""
+    raw = (
+        '{"intent": "faq", "message": "We\'re open \\"9-6\\".\\nCaf\\u00e9 too!", '
+        '"extracted_data": {"message": "nested"}, "booking_complete": false} trailing'
+    )
+    deltas = []
+    scanner = JsonObjectScanner(stream_field="message", on_field_text=deltas.append)
+    
+    end = None
+    for start in range(0, len(raw), 5):
+        end = scanner.feed(raw[start:start + 5])
+        if end is not None:
+            end += start
+            break
+    
+    assert "".join(deltas) == 'We\'re open "9-6".\nCafé too!'
+    assert ConversationResponse.model_validate_json(raw[:end]).message == "".join(deltas)
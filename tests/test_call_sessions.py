@@ -0,0 +1,149 @@
+"""
+Call Session Store Tests
+Tests the CallSid → session mapping for both the in-process and Redis backends.
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from services.orchestrator import call_sessions
+from services.orchestrator.call_sessions import CallSessionStore
+
+
+class FakeClock:
+    """Monotonic clock the tests advance by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class StubRedis:
+    """Just enough of redis.asyncio.Redis for CallSessionStore, expiring on a FakeClock."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.data = {}
+        self.expiries = {}
+        self.close_calls = 0
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiries[key] = self.clock.now + ex if ex else None
+
+    async def get(self, key):
+        expires_at = self.expiries.get(key)
+        if expires_at is not None and expires_at <= self.clock.now:
+            self.data.pop(key, None)
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def aclose(self):
+        self.close_calls += 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fixture patching the store module's clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(call_sessions, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def stub_redis(monkeypatch, clock):
+    """Fixture routing REDIS_URL connections to an in-memory stub."""
+    stub = StubRedis(clock)
+    monkeypatch.setattr(call_sessions, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(
+        call_sessions,
+        "aioredis",
+        SimpleNamespace(from_url=lambda url, decode_responses: stub),
+        raising=False
+    )
+    return stub
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, monkeypatch, clock):
+    """Fixture providing a store for each backend."""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    if request.param == "redis":
+        request.getfixturevalue("stub_redis")
+        return CallSessionStore(redis_url="redis://localhost:6379/0", ttl_seconds=60)
+    return CallSessionStore(ttl_seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_set_get_delete(store):
+    """Test that values round-trip and can be removed."""
+    state = {"session_id": "sess-1", "caller_phone": "+919876543210"}
+
+    await store.set("CA123", state)
+    assert await store.get("CA123") == state
+    assert await store.get("CA-unknown") is None
+
+    await store.set("CA123", {"session_id": "sess-2"})
+    assert await store.get("CA123") == {"session_id": "sess-2"}
+
+    await store.delete("CA123")
+    assert await store.get("CA123") is None
+    await store.delete("CA123")
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(store, clock):
+    """Test that a mapping disappears once its TTL has passed."""
+    await store.set("CA-old", {"session_id": "old"})
+    clock.now += 30
+    await store.set("CA-new", {"session_id": "new"})
+
+    clock.now += 30
+    assert await store.get("CA-old") is None
+    assert await store.get("CA-new") == {"session_id": "new"}
+
+    clock.now += 30
+    assert await store.get("CA-new") is None
+
+
+@pytest.mark.asyncio
+async def test_local_store_drops_expired_entries_on_write(clock, monkeypatch):
+    """Test that the in-process dict doesn't grow with expired calls."""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    store = CallSessionStore(ttl_seconds=60)
+
+    for i in range(5):
+        await store.set(f"CA{i}", {"session_id": str(i)})
+    clock.now += 61
+    await store.set("CA-live", {"session_id": "live"})
+
+    assert list(store._local) == ["CA-live"]
+
+
+@pytest.mark.asyncio
+async def test_redis_keys_use_prefix_and_ttl(stub_redis, clock):
+    """Test that Redis entries are namespaced and carry the TTL."""
+    store = CallSessionStore(redis_url="redis://localhost:6379/0", ttl_seconds=120)
+
+    await store.set("CA123", {"session_id": "sess-1"})
+
+    assert list(stub_redis.data) == ["twilio:session:CA123"]
+    assert stub_redis.expiries["twilio:session:CA123"] == clock.now + 120
+
+
+@pytest.mark.asyncio
+async def test_close_is_idempotent(stub_redis, monkeypatch):
+    """Test that closing twice only closes the Redis pool once."""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    store = CallSessionStore(redis_url="redis://localhost:6379/0")
+    await store.close()
+    await store.close()
+    assert stub_redis.close_calls == 1
+
+    local_store = CallSessionStore()
+    await local_store.close()
+    await local_store.close()
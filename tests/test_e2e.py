@@ -306,6 +306,148 @@ async def test_e2e_call_analytics(log_store):
     assert "urgent_count" in stats
 
 
+
+def test_daily_report_stats_and_recent_calls(tmp_path):
+    """
+    Test that the daily report returns stats and recent calls together.
+    """
+    from services.logging.log_store import CallLog
+    
+    store = CallLogStore(db_path=str(tmp_path / "logs.db"))
+    for i, intent in enumerate(["faq", "booking", "urgent"]):
+        store.create_log(CallLog(
+            session_id=f"report-{i}",
+            start_time=f"2024-01-15T10:0{i}:00",
+            intent=intent,
+            escalated=intent == "urgent"
+        ))
+    store.create_log(CallLog(session_id="other-day", start_time="2024-01-16T09:00:00"))
+    
+    stats, recent = store.get_daily_report("2024-01-15", recent_n=2)
+    
+    assert stats == store.get_daily_stats("2024-01-15")
+    assert stats["total_calls"] == 3
+    assert stats["escalations"] == 1
+    assert [log.session_id for log in recent] == ["report-2", "report-1"]
+
+
+def test_past_day_stats_see_other_writers(tmp_path):
+    """
+    Test that cached stats for a past day pick up logs written by another process.
+    """
+    from services.logging.log_store import CallLog
+    
+    db_path = str(tmp_path / "logs.db")
+    reader = CallLogStore(db_path=db_path)
+    writer = CallLogStore(db_path=db_path)
+    
+    writer.create_log(CallLog(session_id="before", start_time="2024-01-15T23:58:00"))
+    assert reader.get_daily_stats("2024-01-15")["total_calls"] == 1
+    
+    # A call that started before midnight, logged later by another worker
+    writer.create_log(CallLog(session_id="late", start_time="2024-01-15T23:59:30"))
+    assert reader.get_daily_stats("2024-01-15")["total_calls"] == 2
+    
+    reader.close()
+    writer.close()
+
+
+def test_bulk_create_bookings(tmp_path):
+    """
+    Test that bulk inserts assign every booking its stored id.
+    """
+    from services.bookings.store import Booking
+    
+    store = BookingStore(db_path=str(tmp_path / "bookings.db"))
+    store.create_booking(Booking(
+        customer_name="Existing",
+        customer_phone="+15550000000",
+        appointment_date="2024-01-14",
+        appointment_time="09:00"
+    ))
+    count = 105
+    bookings = store.bulk_create_bookings([
+        Booking(
+            customer_name=f"Customer {i}",
+            customer_phone=f"+1555000{i:04d}",
+            appointment_date="2024-01-15",
+            appointment_time=f"{9 + i % 8:02d}:00"
+        )
+        for i in range(count)
+    ])
+    
+    assert len({b.booking_id for b in bookings}) == count
+    assert store.get_booking(bookings[0].booking_id).customer_name == "Customer 0"
+    assert store.get_booking(bookings[-1].booking_id).customer_name == f"Customer {count - 1}"
+    assert len(store.list_bookings(date="2024-01-15", limit=count + 10)) == count
+    store.close()
+
+
+def test_bulk_create_logs(tmp_path):
+    """
+    Test that bulk call-log inserts assign ids and are all queryable.
+    """
+    from services.logging.log_store import CallLog
+    
+    store = CallLogStore(db_path=str(tmp_path / "logs.db"))
+    store.create_log(CallLog(session_id="existing", start_time="2024-01-14T09:00:00"))
+    logs = store.create_logs([
+        CallLog(session_id=f"bulk-{i}", start_time=f"2024-01-15T10:{i:02d}:00", intent="faq")
+        for i in range(50)
+    ])
+    
+    assert len({log.log_id for log in logs}) == 50
+    assert store.get_log("bulk-49").log_id == logs[-1].log_id
+    assert store.get_daily_stats("2024-01-15")["faq_count"] == 50
+    store.close()
+
+
+def test_session_keeps_full_history_for_logging(orchestrator):
+    """
+    Test that only the LLM context is bounded, not the logged transcript.
+    """
+    from services.orchestrator.session_manager import MAX_LLM_CONTEXT_MESSAGES
+    
+    session = orchestrator.create_session(caller_phone="+919876543210")
+    total = 2 * MAX_LLM_CONTEXT_MESSAGES + 2
+    for i in range(total):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"message {i}")
+    
+    llm_context = session.get_conversation_for_llm()
+    assert len(llm_context) <= MAX_LLM_CONTEXT_MESSAGES
+    assert llm_context[-1]["content"] == f"message {total - 1}"
+    
+    conversation = orchestrator.get_session_summary(session.session_id)["conversation"]
+    assert len(conversation) == total
+    assert conversation[0]["content"] == "message 0"
+
+
+def test_session_eviction_spares_active_sessions(monkeypatch):
+    """
+    Test that only idle sessions expire or get evicted at the session cap.
+    """
+    from services.orchestrator import session_manager
+    
+    now = [1000.0]
+    monkeypatch.setattr(session_manager.time, "monotonic", lambda: now[0])
+    orchestrator = ConversationOrchestrator(
+        generate_audio=False, max_sessions=2, session_ttl_seconds=60
+    )
+    
+    old_active = orchestrator.create_session()
+    idle = orchestrator.create_session()
+    
+    # Touching the older session keeps it past its original TTL
+    now[0] += 50
+    assert orchestrator.get_session(old_active.session_id) is old_active
+    now[0] += 20
+    
+    orchestrator.create_session()
+    assert orchestrator.get_session(old_active.session_id) is old_active
+    assert orchestrator.get_session(idle.session_id) is None
+    assert orchestrator.evicted_sessions == 1
+
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v", "-s"])
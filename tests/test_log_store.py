@@ -0,0 +1,133 @@
+"""
+Call Log Store Tests
+Tests transcript encodings and reading rows written before they existed.
+"""
+
+import json
+import sqlite3
+import pytest
+from datetime import datetime
+
+from services.logging import log_store
+from services.logging.log_store import (
+    CallLog,
+    CallLogStore,
+    decode_transcript,
+    encode_transcript,
+)
+
+CONVERSATION = [
+    {"role": "user", "content": "नमस्ते, I need an appointment tomorrow"},
+    {"role": "assistant", "content": "Sure! What time works for you?", "latency_ms": 412},
+    {"role": "user", "content": "10 \"AM\" please\n"},
+]
+
+requires_msgpack = pytest.mark.skipif(not log_store.MSGPACK_AVAILABLE, reason="msgpack not installed")
+requires_zstd = pytest.mark.skipif(not log_store.ZSTD_AVAILABLE, reason="zstandard not installed")
+
+FORMATS = [
+    pytest.param("json", id="json"),
+    pytest.param("msgpack", id="msgpack", marks=requires_msgpack),
+]
+COMPRESSIONS = [
+    pytest.param("none", id="none"),
+    pytest.param("zstd", id="zstd", marks=requires_zstd),
+    pytest.param("zlib", id="zlib"),
+]
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_transcript_roundtrip(fmt, compression):
+    """Test that every format/compression combination decodes to the same messages."""
+    encoded = encode_transcript(CONVERSATION, fmt=fmt, compression=compression)
+
+    if fmt == "json" and compression == "none":
+        assert isinstance(encoded, str)
+    else:
+        assert isinstance(encoded, bytes)
+    assert decode_transcript(encoded) == CONVERSATION
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_transcript_roundtrip_through_store(tmp_path, fmt, compression):
+    """Test that each encoding survives a write to and read from SQLite."""
+    store = CallLogStore(db_path=str(tmp_path / "logs.db"))
+    store.create_log(CallLog(
+        session_id="sess-1",
+        start_time="2024-01-15T10:00:00",
+        transcript=encode_transcript(CONVERSATION, fmt=fmt, compression=compression)
+    ))
+
+    assert store.get_transcript("sess-1") == CONVERSATION
+    assert decode_transcript(store.get_log("sess-1").transcript) == CONVERSATION
+    store.close()
+
+
+@requires_msgpack
+def test_msgpack_encodes_timestamps_as_iso_strings():
+    """Test that msgpack transcripts store datetimes the same way JSON ones do."""
+    at = datetime(2024, 1, 15, 10, 30)
+    conversation = [{"role": "user", "content": "hi", "timestamp": at}]
+
+    decoded = decode_transcript(encode_transcript(conversation, fmt="msgpack", compression="none"))
+    assert decoded == decode_transcript(encode_transcript(conversation, fmt="json", compression="none"))
+    assert decoded[0]["timestamp"] == at.isoformat()
+
+
+def test_decode_empty_transcript():
+    """Test that a missing transcript reads as an empty conversation."""
+    assert decode_transcript(None) == []
+    assert decode_transcript("") == []
+    assert decode_transcript(b"") == []
+
+
+def test_unknown_encoding_rejected():
+    """Test that typos in TRANSCRIPT_FORMAT/TRANSCRIPT_COMPRESSION fail loudly."""
+    with pytest.raises(ValueError):
+        encode_transcript(CONVERSATION, fmt="yaml", compression="none")
+    with pytest.raises(ValueError):
+        encode_transcript(CONVERSATION, fmt="json", compression="lz4")
+
+
+def test_reads_pre_migration_rows(tmp_path):
+    """Test that rows written by the original schema (plain json.dumps TEXT) still decode."""
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE call_logs (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL UNIQUE,
+                caller_phone TEXT,
+                start_time TEXT NOT NULL,
+                end_time TEXT,
+                duration_seconds INTEGER,
+                intent TEXT,
+                transcript TEXT,
+                summary TEXT,
+                booking_created INTEGER DEFAULT 0,
+                booking_id INTEGER,
+                escalated INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'completed'
+            )
+        """)
+        conn.execute(
+            "INSERT INTO call_logs (session_id, start_time, intent, transcript) VALUES (?, ?, ?, ?)",
+            ("legacy-1", "2024-01-10T09:00:00", "faq", json.dumps(CONVERSATION))
+        )
+
+    store = CallLogStore(db_path=str(db_path))
+
+    assert store.get_transcript("legacy-1") == CONVERSATION
+    assert decode_transcript(store.get_log("legacy-1").transcript) == CONVERSATION
+
+    # New rows can be added alongside the old ones
+    store.create_log(CallLog(
+        session_id="new-1",
+        start_time="2024-01-10T10:00:00",
+        transcript=encode_transcript(CONVERSATION, fmt="json", compression="zlib")
+    ))
+    assert store.get_transcript("new-1") == CONVERSATION
+    assert store.get_daily_stats("2024-01-10")["total_calls"] == 2
+    store.close()
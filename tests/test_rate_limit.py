@@ -0,0 +1,102 @@
+"""
+Rate Limiter Tests
+Tests the async token bucket against a fake clock, so no test actually waits.
+"""
+
+import asyncio
+import pytest
+
+from services.utils import rate_limit
+from services.utils.rate_limit import AsyncRateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a limiter sleeps (or a test advances it)."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._real_sleep = asyncio.sleep
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await self._real_sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fixture patching the limiter's clock and sleep."""
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_burst_up_to_capacity(clock):
+    """Test that max_rate calls go through at once, and the next one waits."""
+    limiter = AsyncRateLimiter(max_rate=5, time_period=1)
+
+    for _ in range(5):
+        await limiter.acquire()
+    assert clock.sleeps == []
+
+    await limiter.acquire()
+    assert clock.now == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_refill_over_time(clock):
+    """Test that tokens come back at max_rate per time_period."""
+    limiter = AsyncRateLimiter(max_rate=10, time_period=60)
+
+    for _ in range(10):
+        await limiter.acquire()
+
+    # 12s at 10/min refills two tokens
+    clock.now += 12
+    await limiter.acquire()
+    async with limiter:
+        pass
+    assert clock.sleeps == []
+
+    await limiter.acquire()
+    assert clock.sleeps == [pytest.approx(6)]
+
+    # The bucket never holds more than max_rate tokens
+    clock.now += 3600
+    for _ in range(10):
+        await limiter.acquire()
+    assert len(clock.sleeps) == 1
+    await limiter.acquire()
+    assert len(clock.sleeps) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquirers_respect_rate(clock):
+    """Test that many concurrent callers never exceed the configured rate."""
+    limiter = AsyncRateLimiter(max_rate=5, time_period=1)
+    acquired_at = []
+
+    async def call():
+        async with limiter:
+            acquired_at.append(clock.now)
+
+    await asyncio.gather(*(call() for _ in range(20)))
+
+    assert len(acquired_at) == 20
+    assert acquired_at == sorted(acquired_at)
+    for count, at in enumerate(acquired_at, start=1):
+        # Burst of max_rate, then max_rate per time_period
+        assert count <= 5 + at * 5 + 1e-9
+    assert acquired_at[-1] == pytest.approx(3.0)
+
+
+def test_rejects_non_positive_rate():
+    """Test that a zero rate is refused instead of dividing by zero later."""
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(max_rate=0)
@@ -12,6 +12,7 @@ import time
 
 from services.orchestrator.streaming_pipeline import StreamingPipeline, StreamingSession
 from services.utils.audio_codec import AudioCodec
+from services.utils.audio_channel import AudioOutChannel
 from services.asr.transcribe import MockStreamingASR
 from services.tts.synthesize import MockStreamingTTS
 
@@ -66,6 +67,18 @@ async def test_audio_codec_roundtrip():
     assert len(pcm_decoded) == len(pcm_original)
 
 
+@pytest.mark.asyncio
+async def test_audio_codec_batch_decode():
+    """Test batch μ-law decode matches per-frame decode."""
+    all_codes = bytes(range(256))
+    frames = [base64.b64encode(all_codes[i:i + 160]).decode() for i in (0, 96)]
+    
+    expected = b"".join(AudioCodec.decode_mulaw_base64(f) for f in frames)
+    
+    assert AudioCodec.decode_mulaw_base64_batch(frames) == expected
+    assert len(expected) == 2 * 160 * AudioCodec.SAMPLE_WIDTH
+
+
 @pytest.mark.asyncio
 async def test_audio_resampling():
     """Test audio resampling from 24kHz to 8kHz."""
@@ -423,6 +436,29 @@ async def test_error_handling_invalid_audio():
         print(f"Handled error: {e}")
 
 
+@pytest.mark.asyncio
+async def test_audio_out_channel_drains_in_batches(streaming_pipeline):
+    """Test the writer receives the greeting in one batch and stops on close."""
+    streaming_pipeline.create_session(
+        session_id="test-channel",
+        caller_phone="+919876543210"
+    )
+    channel = AudioOutChannel()
+    
+    await streaming_pipeline.send_greeting("test-channel", channel)
+    queued = channel.qsize()
+    
+    batch = await channel.get_batch()
+    assert len(batch) == queued > 0
+    assert all(message["event"] == "media" for message in batch)
+    
+    # A blocked reader wakes on close and sees the end of the stream
+    reader = asyncio.create_task(channel.get_batch())
+    await asyncio.sleep(0)
+    channel.close()
+    assert await asyncio.wait_for(reader, timeout=1.0) == []
+
+
 if __name__ == "__main__":
     # Run tests
     print("Running Streaming Pipeline Tests\n")